@@ -0,0 +1 @@
+# Benchmarks for the export pipeline; see benchmarks/bench_export.py.
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Benchmark the text export pipeline on a synthetic site.
+
+Times Renderer.render_doc, each theme handler's modify_html, the
+Renderer.add_link fast path and the full MdTxtExportPlugin.on_post_page path
+separately, and reports pages/sec,
+per-page latency percentiles and peak RSS as JSON.
+
+The peak RSS cannot be reset between stages: ``peak_rss_bytes`` is the
+high-water mark of the benchmark process up to the end of a stage, so it
+includes the stages run before it, and ``peak_children_rss_bytes`` is that of
+the largest worker process that has exited by then (with ``workers``, the
+conversion of on_post_page runs in those workers).
+
+Example:
+    python -m benchmarks.bench_export --pages 1000 --output bench.json
+"""
+
+import argparse
+import json
+import platform
+import resource
+import sys
+import tempfile
+from pathlib import Path
+from timeit import default_timer as timer
+from types import SimpleNamespace
+
+from benchmarks.synthetic_site import generate_site, themed_html
+
+THEMES = ["generic", "mkdocs", "material", "cinder"]
+STAGES = ("render_doc", "modify_html", "add_link", "on_post_page")
+
+
+def peak_rss(who: int = resource.RUSAGE_SELF) -> int:
+    """Peak resident set size of this process, or its largest child, in bytes."""
+    rss = resource.getrusage(who).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies: list, total_bytes: int) -> dict:
+    total = sum(latencies)
+    return {
+        "pages": len(latencies),
+        "total_s": total,
+        "pages_per_s": len(latencies) / total if total else 0.0,
+        "mb_per_s": total_bytes / total / 1e6 if total else 0.0,
+        "latency_ms": {
+            "mean": 1000 * total / len(latencies) if latencies else 0.0,
+            "p50": 1000 * percentile(latencies, 0.50),
+            "p90": 1000 * percentile(latencies, 0.90),
+            "p99": 1000 * percentile(latencies, 0.99),
+            "max": 1000 * max(latencies, default=0.0),
+        },
+        "peak_rss_bytes": peak_rss(),
+        "peak_children_rss_bytes": peak_rss(resource.RUSAGE_CHILDREN),
+    }
+
+
+def bench_render_doc(pages: list, options: dict) -> dict:
+    from mkdocs_text_export_plugin.renderer import Renderer
+
+    renderer = Renderer(**options)
+    latencies = []
+    for page, html in pages:
+        start = timer()
+        renderer.render_doc(html, page.url)
+        latencies.append(timer() - start)
+    return summarize(latencies, sum(len(html) for _, html in pages))
+
+
+def bench_modify_html(pages: list, theme: str) -> dict:
+    from mkdocs_text_export_plugin.renderer import Renderer
+
+    handler = Renderer._load_theme_handler(theme)
+    latencies = []
+    for page, html in pages:
+        start = timer()
+        handler.modify_html(html, "index.txt")
+        latencies.append(timer() - start)
+    return summarize(latencies, sum(len(html) for _, html in pages))
+
+
+def bench_add_link(pages: list, theme: str) -> dict:
+    from mkdocs_text_export_plugin.renderer import Renderer
+
+    renderer = Renderer(theme=theme)
+    latencies = []
+    for page, html in pages:
+        start = timer()
+        renderer.add_link(renderer.parse(html), "index.txt")
+        latencies.append(timer() - start)
+    return summarize(latencies, sum(len(html) for _, html in pages))
+
+
+def bench_on_post_page(pages: list, theme: str, plugin_config: dict) -> dict:
+    from mkdocs_text_export_plugin.plugin import MdTxtExportPlugin
+
+    with tempfile.TemporaryDirectory() as site_dir:
+        config = {"theme": SimpleNamespace(name=theme), "site_dir": site_dir}
+        mock_pages = [
+            SimpleNamespace(
+                title=page.title,
+                content=page.content,
+                file=SimpleNamespace(
+                    url=page.url,
+                    src_path=page.src_path,
+                    abs_dest_path=str(Path(site_dir, page.url, "index.html")),
+                ),
+            )
+            for page, _ in pages
+        ]
+
+        plugin = MdTxtExportPlugin()
+        plugin.load_config(plugin_config)
+        try:
+            plugin.on_config(config)
+            plugin.on_nav(SimpleNamespace(pages=mock_pages), config, files=None)
+
+            latencies = []
+            start_build = timer()
+            for mock_page, (_, html) in zip(mock_pages, pages):
+                start = timer()
+                plugin.on_post_page(html, mock_page, config)
+                latencies.append(timer() - start)
+            start = timer()
+            plugin.on_post_build(config)
+            post_build = timer() - start
+            wall = timer() - start_build
+        finally:
+            # Stops the workers, which only then count towards the children
+            plugin.on_shutdown()
+
+    result = summarize(latencies, sum(len(html) for _, html in pages))
+    # With workers, conversion finishes in on_post_build; wall time covers both
+    result["post_build_s"] = post_build
+    result["wall_s"] = wall
+    result["wall_pages_per_s"] = len(pages) / wall if wall else 0.0
+    result["errors"] = plugin.num_errors
+    return result
+
+
+def run_benchmarks(
+    pages: int = 100,
+    theme: str = "mkdocs",
+    sections: int = 4,
+    table_rows: int = 50,
+    seed: int = 0,
+    plugin_config: dict = None,  # type: ignore
+    stages: tuple = STAGES,
+) -> dict:
+    plugin_config = dict(plugin_config or {})
+    site = generate_site(pages, seed, sections, table_rows)
+    themed = [(page, themed_html(page, site, theme)) for page in site]
+
+    renderer_options = {
+        "theme": theme,
+        "markdown": plugin_config.get("markdown", False),
+        "kill_tags": plugin_config.get("kill_tags", []),
+        "file_ext": "md" if plugin_config.get("markdown") else "txt",
+        "backend": plugin_config.get("backend", "html22text"),
+    }
+
+    results: dict = {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "parameters": {
+            "pages": pages,
+            "theme": theme,
+            "sections": sections,
+            "table_rows": table_rows,
+            "seed": seed,
+            "plugin_config": plugin_config,
+            "html_bytes": sum(len(html) for _, html in themed),
+        },
+        "stages": {},
+    }
+    if "render_doc" in stages:
+        results["stages"]["render_doc"] = bench_render_doc(themed, renderer_options)
+    # The material handler looks for its own article markup
+    pages_by_theme = {
+        name: (
+            [(page, themed_html(page, site, name)) for page in site]
+            if name == "material"
+            else themed
+        )
+        for name in THEMES
+    }
+    for stage, bench in (
+        ("modify_html", bench_modify_html),
+        ("add_link", bench_add_link),
+    ):
+        if stage in stages:
+            results["stages"][stage] = {
+                name: bench(pages_by_theme[name], name) for name in THEMES
+            }
+    if "on_post_page" in stages:
+        results["stages"]["on_post_page"] = bench_on_post_page(
+            themed, theme, plugin_config
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=100, help="Number of pages")
+    parser.add_argument("--theme", default="mkdocs")
+    parser.add_argument("--sections", type=int, default=4, help="Sections per page")
+    parser.add_argument("--table-rows", type=int, default=50, help="Rows per table")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--config",
+        default="{}",
+        help='Plugin options as JSON, e.g. \'{"markdown": true, "workers": 4}\'',
+    )
+    parser.add_argument(
+        "--stage",
+        action="append",
+        choices=STAGES,
+        help="Only run the given stage (may be repeated)",
+    )
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    results = run_benchmarks(
+        pages=args.pages,
+        theme=args.theme,
+        sections=args.sections,
+        table_rows=args.table_rows,
+        seed=args.seed,
+        plugin_config=json.loads(args.config),
+        stages=tuple(args.stage or STAGES),
+    )
+    report = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(report)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Synthetic MkDocs sites for benchmarking the export pipeline.
+
+Pages contain headings, prose, large tables, code blocks and admonitions, and
+are wrapped in a theme-like layout with a navigation sidebar, search markup,
+scripts and a footer. The generator is deterministic for a given seed.
+"""
+
+import argparse
+import random
+from dataclasses import dataclass
+from pathlib import Path
+
+WORDS = (
+    "export plugin page text markdown render build theme table code block "
+    "admonition navigation search footer content section example option value "
+    "config site document output input convert parse write link header"
+).split()
+
+
+@dataclass
+class SyntheticPage:
+    title: str
+    src_path: str
+    url: str
+    markdown: str
+    content: str
+
+
+def _sentence(rng: random.Random, words: int = 12) -> str:
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text.capitalize() + "."
+
+
+def _paragraph(rng: random.Random) -> str:
+    return " ".join(
+        _sentence(rng, rng.randint(6, 18)) for _ in range(rng.randint(2, 6))
+    )
+
+
+def _table(rng: random.Random, rows: int, cols: int = 5):
+    header = [f"Column {c + 1}" for c in range(cols)]
+    body = [[rng.choice(WORDS) for _ in range(cols)] for _ in range(rows)]
+    md = ["| " + " | ".join(header) + " |", "|" + " --- |" * cols]
+    md += ["| " + " | ".join(row) + " |" for row in body]
+    html = ["<table>", "<thead><tr>"]
+    html += [f"<th>{cell}</th>" for cell in header]
+    html += ["</tr></thead>", "<tbody>"]
+    html += ["<tr>" + "".join(f"<td>{c}</td>" for c in row) + "</tr>" for row in body]
+    html += ["</tbody>", "</table>"]
+    return "\n".join(md), "\n".join(html)
+
+
+def _code(rng: random.Random, lines: int):
+    code = [
+        f"def {rng.choice(WORDS)}_{i}(value):\n    return value * {i}"
+        for i in range(lines)
+    ]
+    source = "\n".join(code)
+    escaped = source.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    md = f"```python\n{source}\n```"
+    html = (
+        '<div class="highlight"><pre><code class="language-python">'
+        f"{escaped}</code></pre></div>"
+    )
+    return md, html
+
+
+def _admonition(rng: random.Random):
+    kind = rng.choice(["note", "warning", "tip"])
+    text = _sentence(rng)
+    md = f'!!! {kind} "{kind.capitalize()}"\n    {text}'
+    html = (
+        f'<div class="admonition {kind}"><p class="admonition-title">'
+        f"{kind.capitalize()}</p><p>{text}</p></div>"
+    )
+    return md, html
+
+
+def generate_page(
+    rng: random.Random, index: int, sections: int = 4, table_rows: int = 50
+) -> SyntheticPage:
+    title = f"Page {index}: {_sentence(rng, 3)[:-1]}"
+    md = [f"# {title}", ""]
+    html = [f'<h1 id="page-{index}">{title}</h1>']
+    for section in range(sections):
+        heading = f"Section {section + 1}"
+        paragraph = _paragraph(rng)
+        md += [f"## {heading}", "", paragraph, ""]
+        html += [f"<h2>{heading}</h2>", f"<p>{paragraph}</p>"]
+        for block in (
+            _table(rng, table_rows),
+            _code(rng, rng.randint(3, 12)),
+            _admonition(rng),
+        ):
+            md += [block[0], ""]
+            html.append(block[1])
+
+    src_path = f"section-{index // 100}/page-{index}.md"
+    url = f"section-{index // 100}/page-{index}/"
+    return SyntheticPage(title, src_path, url, "\n".join(md), "\n".join(html))
+
+
+def generate_site(
+    pages: int, seed: int = 0, sections: int = 4, table_rows: int = 50
+) -> list:
+    rng = random.Random(seed)
+    return [generate_page(rng, i, sections, table_rows) for i in range(pages)]
+
+
+def themed_html(page: SyntheticPage, site: list, theme: str = "mkdocs") -> str:
+    """Wrap a page body in a theme-like layout, similar to what MkDocs renders."""
+    nav = "\n".join(
+        f'<li class="nav-item"><a href="/{p.url}">{p.title}</a></li>'
+        for p in site[:200]
+    )
+    if theme == "material":
+        article = (
+            '<article class="md-content__inner md-typeset">' f"{page.content}</article>"
+        )
+    else:
+        article = f'<div role="main">{page.content}</div>'
+    return (
+        '<!DOCTYPE html>\n<html><head><meta charset="utf-8">'
+        f"<title>{page.title}</title>"
+        '<link rel="stylesheet" href="/css/theme.css">'
+        "<script>var base_url = '/';</script></head>"
+        f'<body><nav class="sidebar"><ul>{nav}</ul></nav>'
+        '<div class="search"><form><input type="text" name="q"></form></div>'
+        f"{article}"
+        "<footer><p>Built with MkDocs</p></footer>"
+        '<script src="/js/search.js"></script></body></html>'
+    )
+
+
+def write_site(directory: str, site: list, theme: str = "mkdocs"):
+    """Write the synthetic site as a real MkDocs project."""
+    root = Path(directory)
+    docs = root / "docs"
+    for page in site:
+        path = docs / page.src_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(page.markdown)
+
+    nav = "\n".join(f"  - '{p.title}': {p.src_path}" for p in site)
+    (root / "mkdocs.yml").write_text(
+        f"site_name: Synthetic site\ntheme:\n  name: {theme}\n"
+        "markdown_extensions:\n  - admonition\n  - tables\n"
+        f"plugins:\n  - text-export\nnav:\n{nav}\n"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory", help="Directory to write the MkDocs project to")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--sections", type=int, default=4)
+    parser.add_argument("--table-rows", type=int, default=50)
+    parser.add_argument("--theme", default="mkdocs")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    site = generate_site(args.pages, args.seed, args.sections, args.table_rows)
+    write_site(args.directory, site, args.theme)
+    print(f"Wrote {len(site)} pages to {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,19 +5,14 @@ MkDocs Text Export Plugin
 An MkDocs plugin to export content pages as plain-text or Markdown files.
 """
 
-import os
-import sys
-from pathlib import Path
-
-# Add parent directory to path so we can import version
-sys.path.insert(0, str(Path(__file__).parent.parent))
+from importlib.metadata import PackageNotFoundError, version
 
 try:
-    from version import get_version
-
-    __version__ = get_version()
-except ImportError:
-    # Fallback version if version.py is not available
-    __version__ = "1.0.0"
+    # The version is computed from git tags at build time (see version.py)
+    # and read back from the installed package metadata
+    __version__ = version("mkdocs-text-export-plugin")
+except PackageNotFoundError:
+    # Running from a source tree that is not installed
+    __version__ = "0.0.0.dev0+unknown"
 
 __all__ = ["__version__"]
@@ -0,0 +1,363 @@
+import abc
+import logging
+import re
+from importlib import import_module
+from importlib.metadata import PackageNotFoundError
+from importlib.metadata import version as package_version
+
+
+def _package_version(name: str) -> str:
+    try:
+        return package_version(name)
+    except PackageNotFoundError:
+        return "unknown"
+
+
+class Backend(abc.ABC):
+    """Converts the HTML of one page to text.
+
+    Backends receive the converter options of the plugin as keyword
+    arguments and must implement ``convert``. ``version`` becomes part of the
+    conversion cache key, so it must change whenever the output of the backend
+    does.
+    """
+
+    name = ""
+
+    def __init__(
+        self,
+        markdown: bool = False,
+        plain_tables: bool = False,
+        open_quote: str = "“",
+        close_quote: str = "”",
+        default_image_alt: str = "",
+        hide_strikethrough: bool = False,
+        kill_tags: list = [],  # type: ignore
+        file_ext: str = "txt",
+    ):
+        self.markdown: bool = markdown
+        self.plain_tables: bool = plain_tables
+        self.open_quote: str = open_quote
+        self.close_quote: str = close_quote
+        self.default_image_alt: str = default_image_alt
+        self.hide_strikethrough: bool = hide_strikethrough
+        self.kill_tags: list = kill_tags
+        self.file_ext: str = file_ext
+
+    @property
+    def version(self) -> str:
+        return ""
+
+    @property
+    def uses_base_url(self) -> bool:
+        # Output that does not depend on the page location is cached once for
+        # all copies of a page, e.g. in every version of a site
+        return True
+
+    def prepare(self):
+        # Loads what the first conversion would otherwise load
+        pass
+
+    @abc.abstractmethod
+    def convert(self, content: str, base_url: str = "") -> str:
+        pass
+
+    def convert_pruned(self, content: str, base_url: str = "") -> str:
+        # Converts HTML from which the renderer already removed kill_tags;
+        # backends that remove them themselves can skip that here
+        return self.convert(content, base_url)
+
+
+class Html22TextBackend(Backend):
+    name = "html22text"
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        # Joined once; html22text removes them from the tree it parses anyway
+        self._kill_tags = ",".join(self.kill_tags) or None
+
+    @property
+    def version(self) -> str:
+        return _package_version("html22text")
+
+    @property
+    def uses_base_url(self) -> bool:
+        # Only Markdown output keeps links, which are resolved against the page
+        return self.markdown
+
+    def prepare(self):
+        import html22text  # noqa: F401
+
+    def convert(self, content: str, base_url: str = "") -> str:
+        return self._html22text(content, base_url, self._kill_tags)
+
+    def convert_pruned(self, content: str, base_url: str = "") -> str:
+        return self._html22text(content, base_url, None)
+
+    def _html22text(self, content: str, base_url: str, kill_tags) -> str:
+        # Imported on first use so that loading the plugin stays cheap
+        from html22text import html22text
+
+        return html22text(
+            html_content=content,
+            markdown=self.markdown,
+            base_url=base_url,
+            open_quote=self.open_quote,
+            close_quote=self.close_quote,
+            default_image_alt=self.default_image_alt,
+            kill_strikethrough=self.hide_strikethrough,
+            kill_tags=kill_tags,
+            file_ext_override=self.file_ext if self.markdown else "",
+        )
+
+
+_BLOCK_TAGS = {
+    "address",
+    "article",
+    "aside",
+    "body",
+    "dd",
+    "details",
+    "div",
+    "dl",
+    "dt",
+    "fieldset",
+    "figcaption",
+    "figure",
+    "footer",
+    "form",
+    "header",
+    "html",
+    "main",
+    "nav",
+    "p",
+    "section",
+    "summary",
+}
+_SKIP_TAGS = {"head", "script", "style", "template"}
+_STRIKE_TAGS = {"del", "s", "strike"}
+_HEADING = re.compile(r"^h([1-6])$")
+
+
+class _PlainTextWriter:
+    """Walks an lxml tree and collects blocks of text separated by blank lines."""
+
+    def __init__(self, backend: "LxmlBackend"):
+        self.backend = backend
+        self.blocks: list = []
+        self.parts: list = []
+        self.separator: str = ""
+        self.first_prefix = None
+        self.list_depth: int = 0
+        self.last_prefix: str = ""
+
+    def text(self) -> str:
+        return "".join(self.blocks) + "\n" if self.blocks else ""
+
+    def flush(self, prefix: str, lead: str = ""):
+        text = " ".join("".join(self.parts).split())
+        self.parts = []
+        if text:
+            self.emit(prefix, lead + text)
+
+    def emit(self, prefix: str, text: str, separator: str = "\n\n"):
+        before = self.separator if self.blocks else ""
+        quote = prefix.rstrip()
+        if before == "\n\n" and quote and self.last_prefix.startswith(quote):
+            # Keep blank lines inside block quotes quoted
+            before = f"\n{quote}\n"
+        self.last_prefix = prefix
+        if self.first_prefix is not None:
+            # The first line of a list item carries its bullet
+            prefix, self.first_prefix = self.first_prefix, None
+        lines = text.split("\n")
+        first = prefix + lines[0]
+        rest = [(prefix if line else prefix.rstrip()) + line for line in lines[1:]]
+        self.blocks.append(before + "\n".join([first] + rest))
+        self.separator = separator
+
+    def children(self, element, prefix: str):
+        if element.text:
+            self.parts.append(element.text)
+        for child in element:
+            self.element(child, prefix)
+            if child.tail:
+                self.parts.append(child.tail)
+
+    def element(self, element, prefix: str):
+        tag = element.tag
+        if not isinstance(tag, str) or tag in _SKIP_TAGS:
+            # Comments, processing instructions and invisible elements
+            return
+        if tag in _STRIKE_TAGS and self.backend.hide_strikethrough:
+            return
+
+        heading = _HEADING.match(tag)
+        if heading:
+            self.flush(prefix)
+            self.children(element, prefix)
+            self.flush(prefix, "#" * int(heading.group(1)) + " ")
+        elif tag == "br":
+            self.flush(prefix)
+            self.separator = "\n"
+        elif tag == "hr":
+            self.flush(prefix)
+            self.emit(prefix, "* * *")
+        elif tag == "img":
+            alt = element.get("alt") or self.backend.default_image_alt
+            self.parts.append(alt)
+        elif tag == "q":
+            self.parts.append(self.backend.open_quote)
+            self.children(element, prefix)
+            self.parts.append(self.backend.close_quote)
+        elif tag == "pre":
+            self.flush(prefix)
+            code = element.text_content().strip("\n")
+            if code:
+                self.emit(prefix + "    ", code)
+        elif tag == "blockquote":
+            self.flush(prefix)
+            self.children(element, prefix + "> ")
+            self.flush(prefix + "> ")
+        elif tag in ("ul", "ol"):
+            self.flush(prefix)
+            self.list(element, prefix, tag == "ol")
+        elif tag == "table":
+            self.flush(prefix)
+            self.table(element, prefix)
+        elif tag in _BLOCK_TAGS:
+            self.flush(prefix)
+            self.children(element, prefix)
+            self.flush(prefix)
+        else:
+            self.children(element, prefix)
+
+    def list(self, element, prefix: str, ordered: bool):
+        if self.list_depth:
+            # Nested lists continue the enclosing item without a blank line
+            self.separator = "\n"
+        self.list_depth += 1
+        number = 0
+        for child in element:
+            if not isinstance(child.tag, str) or child.tag != "li":
+                self.element(child, prefix)
+                continue
+            number += 1
+            bullet = f"{number}. " if ordered else "* "
+            self.first_prefix = f"{prefix}  {bullet}"
+            self.separator = "\n" if number > 1 else self.separator
+            self.children(child, prefix + "    ")
+            self.flush(prefix + "    ")
+            self.first_prefix = None
+            self.separator = "\n"
+        self.list_depth -= 1
+        self.separator = "\n" if self.list_depth else "\n\n"
+
+    def table(self, element, prefix: str):
+        rows = []
+        for row in element.iter("tr"):
+            cells = [
+                " ".join(cell.text_content().split())
+                for cell in row
+                if isinstance(cell.tag, str) and cell.tag in ("td", "th")
+            ]
+            if any(cells):
+                rows.append(" | ".join(cells))
+        if rows:
+            self.emit(prefix, "\n".join(rows))
+
+
+class LxmlBackend(Backend):
+    """Plain-text conversion on top of lxml's C HTML parser.
+
+    The output follows html22text's plain-text conventions: Markdown-style
+    headings, ``*`` bullets and indented code blocks, with links reduced to
+    their text. Markdown output is not supported.
+    """
+
+    name = "lxml"
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        if self.markdown:
+            raise ValueError("The lxml backend only supports plain-text output")
+        import lxml.html  # noqa: F401
+
+        self._kill = self._compile_kill_tags(self.kill_tags)
+
+    @property
+    def version(self) -> str:
+        return _package_version("lxml")
+
+    @property
+    def uses_base_url(self) -> bool:
+        return False
+
+    @staticmethod
+    def _compile_kill_tags(kill_tags: list):
+        if not kill_tags:
+            return None
+        try:
+            from lxml.cssselect import CSSSelector
+        except ImportError:
+            # Without cssselect, only plain tag names can be matched
+            tags = [tag.strip() for tag in kill_tags]
+            if not all(re.fullmatch(r"[a-zA-Z][a-zA-Z0-9-]*", tag) for tag in tags):
+                logging.warning(
+                    "The lxml backend needs the cssselect module for CSS selectors "
+                    "in kill_tags; only tag names are removed"
+                )
+            return lambda tree: tree.iter(*tags)
+        selector = CSSSelector(",".join(kill_tags))
+        return lambda tree: selector(tree)
+
+    def convert(self, content: str, base_url: str = "") -> str:
+        return self._convert(content, self._kill)
+
+    def convert_pruned(self, content: str, base_url: str = "") -> str:
+        return self._convert(content, None)
+
+    def _convert(self, content: str, kill) -> str:
+        import lxml.html
+        from lxml.etree import ParserError
+
+        try:
+            tree = lxml.html.document_fromstring(content)
+        except ParserError:
+            # Empty documents
+            return ""
+
+        if kill is not None:
+            for element in list(kill(tree)):
+                element.drop_tree()
+
+        writer = _PlainTextWriter(self)
+        writer.element(tree, "")
+        writer.flush("")
+        return writer.text()
+
+
+BACKENDS = {
+    Html22TextBackend.name: Html22TextBackend,
+    LxmlBackend.name: LxmlBackend,
+}
+
+
+def load_backend(name: str, **options) -> Backend:
+    """Create the backend registered as ``name`` or given as ``module:Class``."""
+    if name in BACKENDS:
+        backend_class = BACKENDS[name]
+    elif ":" in name:
+        module_name, class_name = name.split(":", 1)
+        backend_class = getattr(import_module(module_name), class_name)
+    else:
+        raise ValueError(
+            f"Unknown conversion backend {name!r} "
+            f"(choose from {', '.join(BACKENDS)} or give module:Class)"
+        )
+    logging.debug(f"Using conversion backend {name}")
+    try:
+        return backend_class(**options)
+    except TypeError as e:
+        # An incomplete subclass of Backend cannot be instantiated
+        raise ValueError(f"Could not create conversion backend {name!r}: {e}")
@@ -0,0 +1,85 @@
+import hashlib
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup, Tag
+
+BLOCK_TAGS = [
+    "address",
+    "article",
+    "aside",
+    "blockquote",
+    "details",
+    "div",
+    "dl",
+    "fieldset",
+    "figure",
+    "footer",
+    "form",
+    "header",
+    "nav",
+    "ol",
+    "p",
+    "pre",
+    "section",
+    "table",
+    "ul",
+]
+
+
+class BoilerplateIndex:
+    """Finds block-level elements that repeat across the pages of a site.
+
+    In the first phase, ``add`` records the fingerprints of the blocks of every
+    page. Once all pages are known, ``strip`` removes the blocks that appear on
+    more than ``threshold`` (a fraction) of the pages, and on at least two.
+    Blocks with less than ``min_length`` characters of text are ignored.
+    """
+
+    def __init__(self, threshold: float, min_length: int = 20):
+        self.threshold: float = threshold
+        self.min_length: int = min_length
+        self.counts: dict = {}
+        self.num_pages: int = 0
+        self.removed: int = 0
+        self._boilerplate: Optional[set] = None
+
+    def fingerprint(self, element: "Tag") -> Optional[str]:
+        text = " ".join(element.get_text(" ").split())
+        if len(text) < self.min_length:
+            return None
+        return hashlib.sha1(f"{element.name}\0{text}".encode("utf-8")).hexdigest()
+
+    def add(self, soup: "BeautifulSoup"):
+        # Repeats within one page count once
+        fingerprints = {self.fingerprint(element) for element in soup(BLOCK_TAGS)}
+        fingerprints.discard(None)
+        for fingerprint in fingerprints:
+            self.counts[fingerprint] = self.counts.get(fingerprint, 0) + 1
+        self.num_pages += 1
+        self._boilerplate = None
+
+    @property
+    def boilerplate(self) -> set:
+        if self._boilerplate is None:
+            limit = max(1, self.threshold * self.num_pages)
+            self._boilerplate = {
+                fingerprint
+                for fingerprint, count in self.counts.items()
+                if count > limit
+            }
+        return self._boilerplate
+
+    def strip(self, soup: "BeautifulSoup") -> int:
+        boilerplate = self.boilerplate
+        removed = 0
+        if boilerplate:
+            for element in soup(BLOCK_TAGS):
+                # Blocks inside a removed block are already gone
+                if element.decomposed:
+                    continue
+                if self.fingerprint(element) in boilerplate:
+                    element.decompose()
+                    removed += 1
+        self.removed += removed
+        return removed
@@ -0,0 +1,140 @@
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+
+class ConversionMemo:
+    """In-memory LRU map of cache keys to converted text.
+
+    A single instance is shared by every cache in the process, so builds that
+    run one after another in the same process (e.g. one per language) reuse
+    each other's conversions without reading them from disk.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size: int = max_size
+        self.size: int = 0
+        self.entries: OrderedDict = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        text = self.entries.get(key)
+        if text is not None:
+            self.entries.move_to_end(key)
+        return text
+
+    def put(self, key: str, text: str):
+        if len(text) > self.max_size:
+            return
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.size -= len(old)
+        self.entries[key] = text
+        self.size += len(text)
+        while self.size > self.max_size:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def discard(self, key: str):
+        text = self.entries.pop(key, None)
+        if text is not None:
+            self.size -= len(text)
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+
+MEMO = ConversionMemo(64 * 1024 * 1024)
+
+
+class ConversionCache:
+    """Content-addressed on-disk cache of converted pages.
+
+    Entries are keyed on a hash of the page HTML, its base URL and a salt
+    describing every option that affects the output. The total size of the
+    cache is capped; the least recently used entries are evicted first.
+    Lookups go through the process-wide ``MEMO`` first.
+    """
+
+    def __init__(self, cache_dir: str, max_size: int, salt: str = ""):
+        self.cache_dir: Path = Path(cache_dir)
+        self.max_size: int = max_size
+        self.salt: str = salt
+        self.hits: int = 0
+        self.misses: int = 0
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.size: int = sum(p.stat().st_size for p in self._entries())
+
+    def key(self, content: str, base_url: str = "") -> str:
+        digest = hashlib.sha256()
+        for part in (self.salt, base_url, content):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        text = MEMO.get(key)
+        if text is None:
+            try:
+                text = path.read_text(encoding="utf-8")
+            except OSError:
+                self.misses += 1
+                return None
+            MEMO.put(key, text)
+
+        # Touch the entry so that eviction sees it as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return text
+
+    def put(self, key: str, text: str):
+        MEMO.put(key, text)
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        data = text.encode("utf-8")
+
+        # Write atomically so that concurrent builds never see partial entries
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            logging.warning(f"Could not write conversion cache entry {path}: {e}")
+            tmp.unlink(missing_ok=True)
+            return
+
+        self.size += len(data)
+        if self.size > self.max_size:
+            self.evict()
+
+    def evict(self):
+        # Shrink to 90% of the cap so that eviction does not run on every put
+        target = self.max_size * 9 // 10
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        self.size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if self.size <= target:
+                break
+            path.unlink(missing_ok=True)
+            MEMO.discard(path.stem)
+            self.size -= size
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.txt"
+
+    def _entries(self):
+        return self.cache_dir.glob("??/*.txt")
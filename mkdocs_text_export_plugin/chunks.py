@@ -0,0 +1,167 @@
+import glob
+import hashlib
+import json
+import os
+import re
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+
+
+def approx_tokens(text: str) -> int:
+    # About four characters per token for English prose
+    return (len(text) + 3) // 4
+
+
+def _sections(lines_of_text):
+    """Split lines of converted text at Markdown-style headings.
+
+    Headings inside code fences are ignored. Only the current section is held
+    in memory.
+    """
+    path: list = []
+    lines: list = []
+    fence = None
+    for line in lines_of_text:
+        line = line.rstrip("\r\n")
+        fence_match = _FENCE.match(line)
+        if fence_match:
+            marker = fence_match.group(1)
+            fence = None if fence == marker else (fence or marker)
+
+        heading = None if fence else _HEADING.match(line)
+        if heading:
+            if "".join(lines).strip():
+                yield list(path), "\n".join(lines).strip()
+            level = len(heading.group(1))
+            path = path[: level - 1] + [""] * (level - 1 - len(path))
+            path.append(heading.group(2))
+            lines = [line]
+        else:
+            lines.append(line)
+
+    if "".join(lines).strip():
+        yield list(path), "\n".join(lines).strip()
+
+
+def _split(text: str, max_size: int, measure) -> list:
+    """Split an oversized section at paragraph breaks, then at whitespace."""
+    if measure(text) <= max_size:
+        return [text]
+
+    chunks: list = []
+    current = ""
+    for paragraph in re.split(r"\n\s*\n", text):
+        candidate = f"{current}\n\n{paragraph}" if current else paragraph
+        if measure(candidate) <= max_size:
+            current = candidate
+            continue
+        if current:
+            chunks.append(current)
+        current = paragraph
+        while measure(current) > max_size:
+            # Hard split, preferring the last whitespace before the limit
+            limit = max(1, len(current) * max_size // measure(current))
+            cut = current.rfind(" ", 0, limit)
+            cut = cut if cut > 0 else limit
+            chunks.append(current[:cut].rstrip())
+            current = current[cut:].lstrip()
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_chunks(text: str, max_size: int, unit: str = "chars") -> list:
+    """Split converted text into (heading path, content) chunks.
+
+    Chunks follow heading boundaries; sections larger than ``max_size``
+    characters or approximate tokens are split further.
+    """
+    return list(_chunks(text.splitlines(), max_size, unit))
+
+
+def _chunks(lines_of_text, max_size: int, unit: str):
+    measure = approx_tokens if unit == "tokens" else len
+    for path, section in _sections(lines_of_text):
+        for chunk in _split(section, max_size, measure):
+            yield path, chunk
+
+
+class ChunkWriter:
+    """Streams chunk records into sharded JSONL files.
+
+    Shards are written under temporary names and renamed into place by
+    ``close``, which also removes shards left over from earlier builds.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_size: int,
+        unit: str = "chars",
+        shard_size: int = 0,
+        prefix: str = "chunks",
+    ):
+        self.directory: str = directory
+        self.prefix: str = prefix
+        self.max_size: int = max_size
+        self.unit: str = unit
+        self.shard_size: int = shard_size
+        self.shards: list = []
+        self.records: int = 0
+        self._file = None
+        os.makedirs(directory, exist_ok=True)
+
+    def add_page(self, url: str, src_path: str, text: str):
+        self._add(url, src_path, text.splitlines())
+
+    def add_file(self, url: str, src_path: str, filename: str):
+        # Reads the converted text from its export a line at a time, for pages
+        # whose text is not held in memory
+        with open(filename, encoding="utf-8") as f:
+            self._add(url, src_path, f)
+
+    def _add(self, url: str, src_path: str, lines_of_text):
+        for index, (headings, content) in enumerate(
+            _chunks(lines_of_text, self.max_size, self.unit)
+        ):
+            self._write(
+                {
+                    "url": url,
+                    "src_path": src_path,
+                    "headings": headings,
+                    "chunk": index,
+                    "hash": hashlib.sha256(content.encode("utf-8")).hexdigest(),
+                    "content": content,
+                }
+            )
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+        names = []
+        for index, tmp in enumerate(self.shards):
+            name = os.path.join(self.directory, f"{self.prefix}-{index:05d}.jsonl")
+            os.replace(tmp, name)
+            names.append(name)
+        pattern = os.path.join(glob.escape(self.directory), f"{self.prefix}-*.jsonl")
+        for stale in glob.glob(pattern):
+            if stale not in names:
+                os.unlink(stale)
+        self.shards = []
+
+    def _write(self, record: dict):
+        if self._file is None or (
+            self.shard_size and self.records % self.shard_size == 0
+        ):
+            if self._file:
+                self._file.close()
+            tmp = os.path.join(
+                self.directory, f".{self.prefix}-{len(self.shards):05d}.tmp"
+            )
+            self.shards.append(tmp)
+            self._file = open(tmp, "w", encoding="utf-8")
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.records += 1
@@ -0,0 +1,401 @@
+"""
+Export the pages of an already built MkDocs site to text.
+
+Walks the site directory, converts every HTML page next to it in a pool of
+worker processes and, with --inject-links, adds the export link to the page.
+Accepts the options of the text-export plugin as command line flags. With
+--merge, combines the outputs of a sharded export instead.
+
+Example:
+    mkdocs-text-export site --markdown --workers 8 --combined-file llms-full.txt
+    mkdocs-text-export site --merge shard-0 --merge shard-1 --manifest-file m.json
+"""
+
+import argparse
+import logging
+import mmap
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from timeit import default_timer as timer
+from urllib.request import pathname2url
+
+from mkdocs.config import config_options
+from mkdocs.exceptions import PluginError
+
+from .metrics import BuildMetrics, collect, stage
+from .plugin import MdTxtExportPlugin
+from .pool import _get_renderer, close_renderers
+from .rules import PageFilter
+from .shards import merge_shards, shard_info, shard_name, shard_of
+from .watchdog import PageTimeout, limit_memory
+from .writer import write_atomic
+
+
+def read_html(filename: str) -> str:
+    # Decoding straight from the mapping avoids an intermediate bytes copy
+    with open(filename, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return str(data, "utf-8")
+
+
+# Plugin options about the MkDocs build itself, which a built site does not have
+PLUGIN_ONLY_OPTIONS = (
+    "enabled_if_env",
+    "content_only",
+    "boilerplate_threshold",
+    "boilerplate_min_length",
+    "convert_early",
+)
+
+# Sources that MkDocs renders to the index.html of their directory
+INDEX_SOURCES = ("index.md", "index.markdown", "README.md", "README.markdown")
+
+
+def export_path(
+    site_dir: str, html_path: str, file_ext: str, docs_dir: str = ""
+) -> str:
+    """The export file of a built page, named like the plugin names it.
+
+    The plugin names exports after the source file: ``about.md`` and
+    ``about/index.md`` both render to ``about/index.html`` but are exported to
+    ``about/about.txt`` and ``about/index.txt``. Given the ``docs_dir`` of the
+    site, the source is looked up there; without it, ``about/index.html`` is
+    assumed to come from ``about.md``. ``index.html`` at the top of the site is
+    exported to ``index.txt`` and ``page.html`` to ``page.txt``.
+    """
+    path, name = os.path.split(html_path)
+    stem = os.path.splitext(name)[0]
+    if stem == "index" and os.path.abspath(path) != os.path.abspath(site_dir):
+        stem = os.path.basename(path)
+        if docs_dir:
+            src_dir = os.path.join(docs_dir, os.path.relpath(path, site_dir))
+            for source in INDEX_SOURCES:
+                if os.path.isfile(os.path.join(src_dir, source)):
+                    stem = os.path.splitext(source)[0]
+                    break
+    return os.path.join(path, f"{stem}.{file_ext}")
+
+
+def find_pages(
+    site_dir: str, exclude: list, include: list = []  # type: ignore
+) -> list:
+    page_filter = PageFilter(include, exclude)
+    pages = []
+    for root, dirs, files in os.walk(site_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if not name.endswith(".html"):
+                continue
+            filename = os.path.join(root, name)
+            rel_path = os.path.relpath(filename, site_dir).replace(os.sep, "/")
+            if page_filter.matches(rel_path):
+                pages.append(filename)
+    return pages
+
+
+def _export_page(
+    formats: list, html_path: str, txt_paths: list, inject: bool, return_text: bool
+):
+    renderers = [_get_renderer(options) for options in formats]
+    html = read_html(html_path)
+    base_url = pathname2url(os.path.splitext(os.path.abspath(txt_paths[0]))[0])
+
+    with collect() as timings:
+        texts = [
+            renderer.write_txt(html, base_url, txt_path)
+            for renderer, txt_path in zip(renderers, txt_paths)
+        ]
+        # Pages exported before already carry the link
+        if inject and 'title="Text export"' not in html:
+            doc = renderers[0].parse(html)
+            for renderer, txt_path in zip(renderers, txt_paths):
+                renderer.add_link(doc, os.path.basename(txt_path))
+            with stage("write"):
+                write_atomic(html_path, doc.html.encode("utf-8"))
+        for renderer in renderers:
+            for _, error in renderer.flush():
+                raise error
+            if renderer.compressor:
+                for _, error in renderer.compressor.join():
+                    raise error
+    return timings.stages, texts[0] if return_text else None
+
+
+def _add_config_options(parser: argparse.ArgumentParser):
+    # One flag per plugin option, left unset unless given on the command line
+    for name, option in MdTxtExportPlugin.config_scheme:
+        if name in PLUGIN_ONLY_OPTIONS:
+            continue
+        flag = "--" + name.replace("_", "-")
+        text = f"plugin option {name} (default: {option.default!r})"
+        if isinstance(option, config_options.Choice):
+            parser.add_argument(flag, dest=name, choices=option.choices, help=text)
+        elif option._type is bool:
+            parser.add_argument(
+                flag, dest=name, action=argparse.BooleanOptionalAction, help=text
+            )
+        elif option._type is list:
+            parser.add_argument(
+                flag,
+                dest=name,
+                type=lambda value: [item for item in value.split(",") if item],
+                metavar="A,B,...",
+                help=text,
+            )
+        else:
+            # Numbers that may be given as int or float are parsed as float
+            value_type = option._type
+            if isinstance(value_type, tuple):
+                value_type = value_type[-1]
+            parser.add_argument(flag, dest=name, type=value_type, help=text)
+
+
+def export_site(
+    site_dir: str,
+    plugin_config: dict,
+    theme: str = "mkdocs",
+    inject: bool = False,
+    exclude: list = [],  # type: ignore
+    docs_dir: str = "",
+) -> int:
+    """Export every page of a built site and return the number of errors."""
+    ignored = sorted(set(plugin_config) & set(PLUGIN_ONLY_OPTIONS))
+    if ignored:
+        raise ValueError(
+            f"{', '.join(ignored)} only apply to mkdocs build, not to a built site"
+        )
+    plugin = MdTxtExportPlugin()
+    errors, _ = plugin.load_config(plugin_config)
+    if errors:
+        raise ValueError("; ".join(f"{name}: {error}" for name, error in errors))
+    config = plugin.config
+
+    try:
+        formats = plugin.parse_formats()
+    except PluginError as e:
+        raise ValueError(str(e))
+    cache_dir = os.path.abspath(config["cache_dir"]) if config["cache_dir"] else ""
+    store_dir = os.path.abspath(config["store_dir"]) if config["store_dir"] else ""
+    formats = [
+        plugin.build_renderer_options(theme, cache_dir, overrides, store_dir)
+        for overrides in formats
+    ]
+    pages = [
+        (
+            html_path,
+            [
+                export_path(site_dir, html_path, options["file_ext"], docs_dir)
+                for options in formats
+            ],
+        )
+        for html_path in find_pages(
+            site_dir, exclude + config["exclude_pages"], config["include_pages"]
+        )
+    ]
+    page_order = [
+        os.path.relpath(html_path, site_dir).replace(os.sep, "/")
+        for html_path, _ in pages
+    ]
+    shard_count = config["shard_count"]
+    if shard_count > 1:
+        if not 0 <= config["shard_index"] < shard_count:
+            raise ValueError("shard_index must be between 0 and shard_count - 1")
+        if not config["manifest_file"]:
+            raise ValueError("Sharded exports need a manifest_file to be merged")
+        pages = [
+            page
+            for page, rel_path in zip(pages, page_order)
+            if shard_of(rel_path, shard_count) == config["shard_index"]
+        ]
+
+    chunks = None
+    if config["chunks_dir"]:
+        from .chunks import ChunkWriter
+
+        chunks = ChunkWriter(
+            os.path.join(site_dir, config["chunks_dir"]),
+            config["chunk_size"],
+            config["chunk_unit"],
+            config["chunk_shard_size"],
+            prefix=(
+                shard_name("chunks", config["shard_index"], shard_count)
+                if shard_count > 1
+                else "chunks"
+            ),
+        )
+
+    start = timer()
+    args = [(formats, html, txts, inject, bool(chunks)) for html, txts in pages]
+    if config["workers"] > 1:
+        executor = ProcessPoolExecutor(
+            max_workers=config["workers"],
+            initializer=limit_memory,
+            initargs=(config["page_memory_limit"],),
+        )
+        futures = [executor.submit(_export_page, *arg) for arg in args]
+    else:
+        executor = None
+        futures = []
+
+    metrics = BuildMetrics()
+    exports = {}
+    num_errors = 0
+    for index, (html_path, txt_paths) in enumerate(pages):
+        rel_path = os.path.relpath(html_path, site_dir).replace(os.sep, "/")
+        try:
+            if executor:
+                stages, text = futures[index].result()
+            else:
+                stages, text = _export_page(*args[index])
+        except (Exception, PageTimeout) as e:
+            logging.error(f"Error converting {rel_path} to text: {e}")
+            num_errors += 1
+            continue
+        metrics.add(rel_path, stages)
+        for txt_path in txt_paths:
+            exports[txt_path] = rel_path
+        if chunks and text is None:
+            # Streamed pages are chunked from their export on disk
+            chunks.add_file(rel_path, rel_path, txt_paths[0])
+        elif chunks:
+            chunks.add_page(rel_path, rel_path, text)
+    if executor:
+        executor.shutdown()
+
+    if chunks:
+        chunks.close()
+
+    if config["combined_file"] and shard_count <= 1:
+        combined_file = os.path.join(site_dir, config["combined_file"])
+        for index, options in enumerate(formats):
+            renderer = _get_renderer(options)
+            renderer.pages = [
+                (txt_paths[index], "", "")
+                for _, txt_paths in pages
+                if txt_paths[index] in exports
+            ]
+            if index > 0:
+                combined_file = (
+                    f"{os.path.splitext(combined_file)[0]}.{renderer.file_ext}"
+                )
+            renderer.write_combined(combined_file)
+    close_renderers()
+
+    if store_dir:
+        from .store import BlobStore
+
+        BlobStore(store_dir, config["store_max_size"] * 1024 * 1024).evict()
+
+    if config["manifest_file"]:
+        from .manifest import build_manifest, load_manifest, write_manifest
+
+        manifest_file = os.path.join(site_dir, config["manifest_file"])
+        if shard_count > 1:
+            manifest_file = shard_name(
+                manifest_file, config["shard_index"], shard_count
+            )
+        manifest = build_manifest(site_dir, exports, load_manifest(manifest_file))
+        if shard_count > 1:
+            manifest.update(
+                shard_info(
+                    config["shard_index"],
+                    shard_count,
+                    page_order,
+                    {rel_path: rel_path for rel_path in exports.values()},
+                    [options["file_ext"] for options in formats],
+                    config["combined_file"],
+                    config["chunks_dir"],
+                )
+            )
+        write_manifest(manifest_file, manifest)
+
+    logging.info(f"Converting {len(pages)} files to text took {timer() - start:.1f}s")
+    if config["slowest_pages"] > 0 and metrics.pages:
+        logging.info(
+            "Slowest pages (seconds):\n" + metrics.report(config["slowest_pages"])
+        )
+    if config["metrics_file"]:
+        metrics.write(config["metrics_file"])
+    if num_errors > 0:
+        logging.error(f"{num_errors} conversion errors occurred (see above)")
+    return num_errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("site_dir", help="Directory of the built site")
+    parser.add_argument(
+        "--theme", default="mkdocs", help="Theme the site was built with"
+    )
+    parser.add_argument(
+        "--inject-links",
+        action="store_true",
+        help="Add the export link to every page that does not have it yet",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=None,
+        metavar="GLOB",
+        help="Skip pages whose path in the site matches (default: 404.html)",
+    )
+    parser.add_argument(
+        "--docs-dir",
+        default="",
+        help="Documentation sources of the site, to name exports like the plugin",
+    )
+    parser.add_argument(
+        "--merge",
+        action="append",
+        default=None,
+        metavar="DIR",
+        help="Merge the outputs of a sharded export from DIR into site_dir instead "
+        "of exporting (repeat for every shard; give site_dir if they are there)",
+    )
+    _add_config_options(parser)
+    parser.set_defaults(workers=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    plugin_config = {
+        name: getattr(args, name)
+        for name, _ in MdTxtExportPlugin.config_scheme
+        if getattr(args, name, None) is not None
+    }
+    logging.basicConfig(
+        format="%(levelname)s: %(message)s",
+        level=logging.DEBUG if plugin_config.get("verbose") else logging.INFO,
+    )
+
+    if args.merge is not None:
+        if not plugin_config.get("manifest_file"):
+            parser.error("--merge needs the --manifest-file of the shards")
+        try:
+            merge_shards(
+                args.site_dir,
+                plugin_config["manifest_file"],
+                args.merge,
+                plugin_config.get("combined_file", ""),
+            )
+        except (OSError, ValueError) as e:
+            parser.exit(2, f"{parser.prog}: error: {e}\n")
+        sys.exit(0)
+
+    try:
+        num_errors = export_site(
+            args.site_dir,
+            plugin_config,
+            theme=args.theme,
+            inject=args.inject_links,
+            exclude=["404.html"] if args.exclude is None else args.exclude,
+            docs_dir=args.docs_dir,
+        )
+    except (OSError, ValueError) as e:
+        parser.exit(2, f"{parser.prog}: error: {e}\n")
+    sys.exit(1 if num_errors else 0)
+
+
+if __name__ == "__main__":
+    main()
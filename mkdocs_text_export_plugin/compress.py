@@ -0,0 +1,83 @@
+import gzip
+import logging
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .writer import write_atomic
+
+
+def _gzip(data: bytes) -> bytes:
+    # A fixed mtime keeps the output identical for identical input
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _brotli_compressor():
+    try:
+        import brotli  # type: ignore
+    except ImportError:
+        try:
+            import brotlicffi as brotli  # type: ignore
+        except ImportError:
+            return None
+    return brotli.compress
+
+
+class Compressor:
+    """Writes precompressed sidecar files next to the exports.
+
+    Compression runs in a thread pool so that it overlaps with the conversion
+    of the next pages; ``join`` waits for it and returns the file name and
+    exception of every failed job.
+    """
+
+    def __init__(self, formats: list, threads: int = 2):
+        self.compressors: dict = {}
+        for ext in formats:
+            if ext == "gz":
+                self.compressors[ext] = _gzip
+            elif ext == "br":
+                compress = _brotli_compressor()
+                if compress is None:
+                    logging.warning(
+                        "Brotli compression requested but no brotli module is installed"
+                    )
+                    continue
+                self.compressors[ext] = compress
+            else:
+                logging.warning(f"Unknown compression format {ext}")
+        self.executor = ThreadPoolExecutor(max_workers=threads)
+        self.pending: list[tuple[str, Future]] = []
+
+    def is_current(self, filename: str) -> bool:
+        return all(os.path.exists(f"{filename}.{ext}") for ext in self.compressors)
+
+    def submit(self, filename: str, data: bytes):
+        if self.compressors:
+            future = self.executor.submit(self._compress, filename, data)
+            self.pending.append((filename, future))
+
+    def submit_file(self, filename: str):
+        # Reads the file in the compression thread, for data not held in memory
+        if self.compressors:
+            future = self.executor.submit(self._compress_file, filename)
+            self.pending.append((filename, future))
+
+    def join(self) -> list[tuple[str, BaseException]]:
+        errors = []
+        for filename, future in self.pending:
+            error = future.exception()
+            if error is not None:
+                errors.append((filename, error))
+        self.pending = []
+        return errors
+
+    def shutdown(self):
+        self.executor.shutdown(cancel_futures=True)
+
+    def _compress_file(self, filename: str):
+        with open(filename, "rb") as f:
+            self._compress(filename, f.read())
+
+    def _compress(self, filename: str, data: bytes):
+        for ext, compress in self.compressors.items():
+            write_atomic(f"{filename}.{ext}", compress(data))
@@ -0,0 +1,57 @@
+from typing import TYPE_CHECKING
+
+from .metrics import stage
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+
+class HtmlDocument:
+    """The HTML of one page and, once needed, its parsed tree.
+
+    The tree is created on first access to ``soup`` and shared by the stages
+    that work on a tree, such as ``modify_soup`` handlers and the boilerplate
+    filter. The backends convert ``html`` and parse it themselves. Stages that
+    change the tree call ``mark_modified`` so that ``html`` reserializes it;
+    otherwise the original markup is returned as is.
+    """
+
+    def __init__(self, html: str):
+        self._html: str = html
+        self._soup = None
+        self.modified: bool = False
+        # The kill_tags selectors already removed from the tree, if any
+        self.killed = None
+
+    @property
+    def parsed(self) -> bool:
+        return self._soup is not None
+
+    @property
+    def soup(self) -> "BeautifulSoup":
+        if self._soup is None:
+            # Imported on first use so that loading the plugin stays cheap
+            from bs4 import BeautifulSoup
+
+            with stage("parse"):
+                self._soup = BeautifulSoup(self._html, "html.parser")
+        return self._soup
+
+    @property
+    def html(self) -> str:
+        if self.modified:
+            self._html = str(self._soup)
+            self.modified = False
+        return self._html
+
+    def mark_modified(self):
+        self.modified = True
+
+    def update(self, html: str):
+        # Replaces the markup, e.g. after a link was spliced into it
+        self._html = html
+        self._soup = None
+        self.modified = False
+
+    def __str__(self) -> str:
+        return self.html
@@ -0,0 +1,79 @@
+import re
+from typing import Optional
+
+# Tokens that matter for locating a tag: comments, raw-text elements whose
+# content must be skipped, and the head/body/footer tags themselves
+_TOKEN = re.compile(
+    r"<!--|<(/?)(script|style|textarea|head|body|footer)(?=[\s/>])", re.IGNORECASE
+)
+_TAG_END = re.compile(r"""(?:[^>"']|"[^"]*"|'[^']*')*>""")
+_RAW_TEXT_END = {
+    tag: re.compile(rf"</{tag}\s*>", re.IGNORECASE)
+    for tag in ("script", "style", "textarea")
+}
+
+
+def _scan(html: str, name: str, closing: bool, within: str) -> Optional[int]:
+    """Find where a tag starts (closing) or where its start tag ends (opening).
+
+    The document is scanned once from the start, skipping comments and the
+    content of raw-text elements. The tag only counts if the start tag of
+    ``within`` was seen before it. ``None`` means the position is ambiguous
+    and the caller should fall back to a real parser.
+    """
+    seen: set = set()
+    pos = 0
+    while True:
+        match = _TOKEN.search(html, pos)
+        if match is None:
+            return None
+
+        if match.group(0) == "<!--":
+            end = html.find("-->", match.end())
+            if end < 0:
+                return None
+            pos = end + 3
+            continue
+
+        is_closing = bool(match.group(1))
+        tag = match.group(2).lower()
+        if is_closing == closing and tag == name:
+            if within not in seen:
+                return None
+            if closing:
+                return match.start()
+            end_match = _TAG_END.match(html, match.end())
+            return end_match.end() if end_match else None
+
+        if is_closing:
+            pos = match.end()
+            continue
+
+        seen.add(tag)
+        end_match = _TAG_END.match(html, match.end())
+        if end_match is None:
+            return None
+        pos = end_match.end()
+        if tag in _RAW_TEXT_END:
+            close = _RAW_TEXT_END[tag].search(html, pos)
+            if close is None:
+                return None
+            pos = close.end()
+
+
+def insert_before_end_tag(html: str, name: str, fragment: str) -> Optional[str]:
+    """Insert ``fragment`` just before ``</name>``, e.g. at the end of <head>."""
+    pos = _scan(html, name, closing=True, within=name)
+    if pos is None:
+        return None
+    return html[:pos] + fragment + html[pos:]
+
+
+def insert_after_start_tag(
+    html: str, name: str, fragment: str, within: str = "body"
+) -> Optional[str]:
+    """Insert ``fragment`` just after ``<name ...>``, e.g. at the start of <footer>."""
+    pos = _scan(html, name, closing=False, within=within)
+    if pos is None:
+        return None
+    return html[:pos] + fragment + html[pos:]
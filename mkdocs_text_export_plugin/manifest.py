@@ -0,0 +1,83 @@
+import hashlib
+import json
+import logging
+import os
+
+from .writer import write_atomic
+
+MANIFEST_VERSION = 1
+
+
+def load_manifest(filename: str) -> dict:
+    # A missing or unreadable manifest is treated as an empty previous build
+    try:
+        with open(filename, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest
+
+
+def _sha256(filename: str) -> str:
+    digest = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_manifest(site_dir: str, exports: dict, previous: dict) -> dict:
+    """List every export with its source path, size and content hash.
+
+    ``exports`` maps export file names to page source paths. Files whose size
+    and modification time match the previous manifest keep their hash instead
+    of being read again. Files that do not exist are left out with a warning.
+    """
+    old_files = previous.get("files", {})
+    files = {}
+    for filename, src_path in sorted(exports.items()):
+        try:
+            stat = os.stat(filename)
+        except FileNotFoundError:
+            logging.warning(f"Export {filename} is missing from the manifest")
+            continue
+        path = os.path.relpath(filename, site_dir).replace(os.sep, "/")
+        old = old_files.get(path, {})
+        if old.get("size") == stat.st_size and old.get("mtime_ns") == stat.st_mtime_ns:
+            sha256 = old["sha256"]
+        else:
+            sha256 = _sha256(filename)
+        files[path] = {
+            "src_path": src_path,
+            "size": stat.st_size,
+            "sha256": sha256,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+
+    return {
+        "version": MANIFEST_VERSION,
+        "files": files,
+        "changes": diff_manifests(previous, {"files": files}),
+    }
+
+
+def diff_manifests(old: dict, new: dict) -> dict:
+    old_files = old.get("files", {})
+    new_files = new.get("files", {})
+    return {
+        "added": sorted(path for path in new_files if path not in old_files),
+        "changed": sorted(
+            path
+            for path, entry in new_files.items()
+            if path in old_files and old_files[path]["sha256"] != entry["sha256"]
+        ),
+        "removed": sorted(path for path in old_files if path not in new_files),
+    }
+
+
+def write_manifest(filename: str, manifest: dict):
+    os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+    data = json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8")
+    write_atomic(filename, data)
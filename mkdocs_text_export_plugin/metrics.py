@@ -0,0 +1,112 @@
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+from timeit import default_timer as timer
+from typing import Optional
+
+STAGES = ("parse", "convert", "write", "inject")
+
+
+class PageTimings:
+    """Exclusive time spent in each stage while exporting one page.
+
+    When stages nest (e.g. a parse triggered by link injection), the time is
+    charged to the innermost stage only.
+    """
+
+    def __init__(self):
+        self.stages: dict = {}
+        self._active: list = []
+
+    def enter(self, name: str):
+        now = timer()
+        if self._active:
+            self._charge(now)
+        self._active.append([name, now])
+
+    def exit(self):
+        self._charge(timer())
+        self._active.pop()
+        if self._active:
+            self._active[-1][1] = timer()
+
+    def _charge(self, now: float):
+        name, start = self._active[-1]
+        self.stages[name] = self.stages.get(name, 0.0) + now - start
+
+
+_current: ContextVar[Optional[PageTimings]] = ContextVar(
+    "text_export_page_timings", default=None
+)
+
+
+@contextmanager
+def stage(name: str):
+    """Time a pipeline stage for the page that is currently being collected."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+
+    timings.enter(name)
+    try:
+        yield
+    finally:
+        timings.exit()
+
+
+@contextmanager
+def collect():
+    """Collect stage timings of everything that runs inside the block."""
+    timings = PageTimings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+class BuildMetrics:
+    """Per-page stage timings of one build."""
+
+    def __init__(self):
+        self.pages: dict = {}
+
+    def add(self, page: str, stages: dict):
+        timings = self.pages.setdefault(page, {})
+        for name, seconds in stages.items():
+            timings[name] = timings.get(name, 0.0) + seconds
+
+    def totals(self) -> dict:
+        totals = dict.fromkeys(STAGES, 0.0)
+        for timings in self.pages.values():
+            for name, seconds in timings.items():
+                totals[name] = totals.get(name, 0.0) + seconds
+        return totals
+
+    def slowest(self, count: int) -> list:
+        ranked = sorted(
+            self.pages.items(), key=lambda item: sum(item[1].values()), reverse=True
+        )
+        return ranked[:count]
+
+    def report(self, count: int) -> str:
+        width = max([len(page) for page, _ in self.slowest(count)] + [4])
+        lines = [
+            f"{'Page':<{width}}  {'total':>8}"
+            + "".join(f"  {name:>8}" for name in STAGES)
+        ]
+        for page, timings in self.slowest(count):
+            lines.append(
+                f"{page:<{width}}  {sum(timings.values()):>8.3f}"
+                + "".join(f"  {timings.get(name, 0.0):>8.3f}" for name in STAGES)
+            )
+        return "\n".join(lines)
+
+    def write(self, filename: str):
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(
+                {"stages": list(STAGES), "totals": self.totals(), "pages": self.pages},
+                f,
+                indent=2,
+            )
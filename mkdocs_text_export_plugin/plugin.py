@@ -1,10 +1,34 @@
+import hashlib
 import logging
 import os
+import shutil
 from timeit import default_timer as timer
 
 from mkdocs.config import config_options
+from mkdocs.config.base import ValidationError
+from mkdocs.exceptions import PluginError
 from mkdocs.plugins import BasePlugin
 
+from .metrics import BuildMetrics, collect, stage
+from .rules import PageFilter
+from .watchdog import PageTimeout
+from .writer import link_file
+
+# Characters of a page encoded at a time when it is fingerprinted
+FINGERPRINT_SLICE = 1024 * 1024
+
+# Converter options that each output format can override
+FORMAT_OPTIONS = (
+    "markdown",
+    "plain_tables",
+    "open_quote",
+    "close_quote",
+    "default_image_alt",
+    "hide_strikethrough",
+    "kill_tags",
+    "backend",
+)
+
 
 class MdTxtExportPlugin(BasePlugin):
     config_scheme = (
@@ -18,18 +42,113 @@ class MdTxtExportPlugin(BasePlugin):
         ("hide_strikethrough", config_options.Type(bool, default=False)),
         ("kill_tags", config_options.Type(list, default=[])),
         ("theme_handler_path", config_options.Type(str, default="")),
+        ("cache_dir", config_options.Type(str, default="")),
+        ("cache_max_size", config_options.Type(int, default=256)),
+        ("workers", config_options.Type(int, default=0)),
+        ("content_only", config_options.Type(bool, default=False)),
+        ("combined_file", config_options.Type(str, default="")),
+        ("slowest_pages", config_options.Type(int, default=10)),
+        ("metrics_file", config_options.Type(str, default="")),
+        ("compress", config_options.Type(list, default=[])),
+        ("write_behind", config_options.Type(bool, default=False)),
+        ("chunks_dir", config_options.Type(str, default="")),
+        ("chunk_size", config_options.Type(int, default=2000)),
+        (
+            "chunk_unit",
+            config_options.Choice(("chars", "tokens"), default="chars"),
+        ),
+        ("chunk_shard_size", config_options.Type(int, default=0)),
+        ("manifest_file", config_options.Type(str, default="")),
+        ("backend", config_options.Type(str, default="html22text")),
+        ("formats", config_options.Type(list, default=[])),
+        ("boilerplate_threshold", config_options.Type(float, default=0.0)),
+        ("boilerplate_min_length", config_options.Type(int, default=20)),
+        ("page_timeout", config_options.Type((int, float), default=0)),
+        ("page_memory_limit", config_options.Type(int, default=0)),
+        (
+            "on_timeout",
+            config_options.Choice(("fallback", "skip"), default="fallback"),
+        ),
+        ("store_dir", config_options.Type(str, default="")),
+        ("store_max_size", config_options.Type(int, default=1024)),
+        ("shard_index", config_options.Type(int, default=0)),
+        ("shard_count", config_options.Type(int, default=1)),
+        ("include_pages", config_options.Type(list, default=[])),
+        ("exclude_pages", config_options.Type(list, default=[])),
+        ("convert_early", config_options.Type(bool, default=False)),
+        ("stream_threshold", config_options.Type(int, default=0)),
     )
 
     def __init__(self):
         self.renderer = None
+        self.renderers = []
+        self.renderer_options = None
+        self.formats = [{}]
+        self.pool = None
+        self.pool_options = None
+        self.chunks = None
+        self.boilerplate = None
+        self.deferred = []
+        self.spool_dir = None
+        self.convert_early = False
+        self.early_fingerprints = {}
+        self.submitted = set()
+        self.fingerprints = {}
+        self.serving = False
+        self.keep_dir = None
+        self.exports = {}
+        self.page_urls = {}
+        self.previous_manifest = {}
+        self.page_filter = PageFilter()
+        self.metrics = None
         self.enabled = True
         self.markdown = False
         self.file_ext = "txt"
         self.num_files = 0
+        self.num_skipped = 0
+        self.num_excluded = 0
         self.num_errors = 0
+        self.fallback_pages = []
         self.total_time = 0
 
+    def on_startup(self, command, dirty):
+        # Defining this event makes MkDocs keep the plugin instance, and with it
+        # the renderer, the worker pool and the page fingerprints, across
+        # `mkdocs serve` rebuilds
+        self.serving = command == "serve"
+
+    def on_shutdown(self):
+        self._shutdown_pool()
+        from .pool import close_renderers
+
+        close_renderers()
+        for renderer in self.renderers:
+            renderer.close()
+        self.renderers = []
+        self.renderer = None
+        self._discard_deferred()
+        if self.keep_dir:
+            shutil.rmtree(self.keep_dir, ignore_errors=True)
+        self.keep_dir = None
+        self.fingerprints = {}
+
+    def _shutdown_pool(self):
+        if self.pool:
+            self.pool.shutdown()
+        self.pool = None
+        self.pool_options = None
+
     def on_config(self, config):
+        self.metrics = BuildMetrics()
+        self.exports = {}
+        self.page_urls = {}
+        self.num_files = 0
+        self.num_excluded = 0
+        self.num_skipped = 0
+        self.num_errors = 0
+        self.fallback_pages = []
+        self.total_time = 0
+
         # Access plugin config via self.config, not config argument
         if self.config["enabled_if_env"]:
             env_name = self.config["enabled_if_env"]
@@ -42,9 +161,19 @@ class MdTxtExportPlugin(BasePlugin):
                 )
                 return  # Return None to disable plugin
 
-        self.markdown = self.config["markdown"]
-        if self.markdown:
-            self.file_ext = "md"
+        self.formats = self.parse_formats()
+        self.page_filter = PageFilter(
+            self.config["include_pages"], self.config["exclude_pages"]
+        )
+        if not 0 <= self.config["shard_index"] < max(1, self.config["shard_count"]):
+            raise PluginError(
+                f"shard_index must be between 0 and shard_count - 1, "
+                f"got {self.config['shard_index']}"
+            )
+        if self.sharded and not self.config["manifest_file"]:
+            raise PluginError("Sharded exports need a manifest_file to be merged")
+        self.markdown = self.formats[0].get("markdown", self.config["markdown"])
+        self.file_ext = "md" if self.markdown else "txt"
 
         log = logging.getLogger(__name__)
         if self.config["verbose"]:
@@ -56,79 +185,669 @@ class MdTxtExportPlugin(BasePlugin):
         handler.setFormatter(logging.Formatter("%(levelname)s: %(message)s"))
         return config
 
+    def on_pre_build(self, config):
+        # Read the previous manifest before MkDocs cleans the site directory
+        if self.enabled and self.config["manifest_file"]:
+            from .manifest import load_manifest
+
+            self.previous_manifest = load_manifest(self._manifest_path(config))
+
     def on_nav(self, nav, config, files):
         if not self.enabled:
             return nav
 
         from .renderer import Renderer
 
-        self.renderer = Renderer(
-            theme=config["theme"].name,
-            theme_handler_path=self.config["theme_handler_path"],
-            markdown=self.markdown,
-            plain_tables=self.config["plain_tables"],
-            open_quote=self.config["open_quote"],
-            close_quote=self.config["close_quote"],
-            default_image_alt=self.config["default_image_alt"],
-            hide_strikethrough=self.config["hide_strikethrough"],
-            kill_tags=self.config["kill_tags"],
-            file_ext=self.file_ext,
+        cache_dir = self._project_path(config, self.config["cache_dir"])
+        store_dir = self._project_path(config, self.config["store_dir"])
+        renderer_options = [
+            self.build_renderer_options(
+                config["theme"].name, cache_dir, overrides, store_dir
+            )
+            for overrides in self.formats
+        ]
+        if not self.renderers or renderer_options != self.renderer_options:
+            for renderer in self.renderers:
+                renderer.close()
+            try:
+                self.renderers = [Renderer(**options) for options in renderer_options]
+            except (ImportError, ValueError) as e:
+                raise PluginError(f"Could not set up the text export: {e}")
+            self.renderer_options = renderer_options
+            self.fingerprints = {}
+        # The first format is the primary one, used for chunks
+        self.renderer = self.renderers[0]
+
+        if self.config["boilerplate_threshold"] > 0:
+            import tempfile
+
+            from .boilerplate import BoilerplateIndex
+
+            # Pages are converted in on_post_build, once every page was seen
+            self.boilerplate = BoilerplateIndex(
+                self.config["boilerplate_threshold"],
+                self.config["boilerplate_min_length"],
+            )
+            self.deferred = []
+            self.spool_dir = tempfile.mkdtemp(prefix="mkdocs-text-export-")
+
+        # Pages are converted from on_page_content, while MkDocs renders the
+        # templates, unless the boilerplate must be known first
+        self.convert_early = (
+            self.config["convert_early"]
+            and not self.boilerplate
+            and self.config["workers"] > 0
         )
+        if self.config["convert_early"] and self.boilerplate:
+            logging.warning("convert_early has no effect with boilerplate_threshold")
+        elif self.config["convert_early"] and self.config["workers"] <= 0:
+            # In a thread of the build process, the conversion would compete
+            # with template rendering for the GIL and escape page_timeout
+            logging.warning(
+                "convert_early needs workers > 0; pages are converted in on_post_page"
+            )
+        self.early_fingerprints = {}
+        self.submitted = set()
 
-        self.renderer.pages = [None] * len(nav.pages)
-        for page in nav.pages:
-            self.renderer.page_order.append(page.file.url)
+        if self.config["workers"] > 0:
+            pool_options = dict(
+                workers=self.config["workers"],
+                formats=renderer_options,
+                return_text=bool(self.config["chunks_dir"]),
+                memory_limit=self.config["page_memory_limit"],
+            )
+            # The pool and the state of its workers are kept across rebuilds
+            if self.pool is None or pool_options != self.pool_options:
+                from .pool import PagePool
+
+                self._shutdown_pool()
+                self.pool = PagePool(**pool_options)
+                self.pool_options = pool_options
+        else:
+            self._shutdown_pool()
+        if self.config["page_memory_limit"] > 0 and self.config["workers"] <= 0:
+            logging.warning("page_memory_limit only applies when workers > 0")
+
+        if self.config["chunks_dir"]:
+            from .chunks import ChunkWriter
+
+            self.chunks = ChunkWriter(
+                os.path.join(config["site_dir"], self.config["chunks_dir"]),
+                self.config["chunk_size"],
+                self.config["chunk_unit"],
+                self.config["chunk_shard_size"],
+                prefix=self._shard_name("chunks"),
+            )
+
+        for renderer in self.renderers:
+            renderer.pages = [None] * len(nav.pages)
+            renderer.page_order = [page.file.url for page in nav.pages]
+            renderer.page_positions = {
+                url: pos for pos, url in enumerate(renderer.page_order)
+            }
 
         return nav
 
-    def on_post_page(self, output_content, page, config):
-        if not self.enabled:
-            return output_content
+    def parse_formats(self) -> list:
+        # Each format is a dict of FORMAT_OPTIONS overrides; "txt" and "md"
+        # are shorthands for plain text and Markdown
+        options = dict(self.config_scheme)
+        formats = []
+        for entry in self.config["formats"] or [{}]:
+            if entry in ("txt", "md"):
+                entry = {"markdown": entry == "md"}
+            elif not isinstance(entry, dict) or set(entry) - set(FORMAT_OPTIONS):
+                raise PluginError(
+                    f"Invalid output format {entry!r}: use txt, md or a mapping of "
+                    f"{', '.join(FORMAT_OPTIONS)}"
+                )
+            # Overrides are checked like the plugin options they replace
+            overrides = {}
+            for name, value in entry.items():
+                try:
+                    overrides[name] = options[name].validate(value)
+                except ValidationError as e:
+                    raise PluginError(f"Invalid {name} of output format {entry!r}: {e}")
+            formats.append(overrides)
 
-        start = timer()
+        exts = [
+            "md" if entry.get("markdown", self.config["markdown"]) else "txt"
+            for entry in formats
+        ]
+        if len(set(exts)) != len(exts):
+            raise PluginError("Output formats must produce different file types")
+        return formats
+
+    def build_renderer_options(
+        self,
+        theme: str,
+        cache_dir: str,
+        overrides: dict = None,  # type: ignore
+        store_dir: str = "",
+    ) -> dict:
+        # The keyword arguments of Renderer for this plugin configuration and
+        # the converter options of one output format
+        options = {name: self.config[name] for name in FORMAT_OPTIONS}
+        options.update(overrides or {})
+        return dict(
+            theme=theme,
+            theme_handler_path=self.config["theme_handler_path"],
+            markdown=options["markdown"],
+            plain_tables=options["plain_tables"],
+            open_quote=options["open_quote"],
+            close_quote=options["close_quote"],
+            default_image_alt=options["default_image_alt"],
+            hide_strikethrough=options["hide_strikethrough"],
+            kill_tags=options["kill_tags"],
+            file_ext="md" if options["markdown"] else "txt",
+            cache_dir=cache_dir,
+            cache_max_size=self.config["cache_max_size"],
+            compress=self.config["compress"],
+            write_behind=self.config["write_behind"],
+            backend=options["backend"],
+            timeout=self.config["page_timeout"],
+            on_timeout=self.config["on_timeout"],
+            store_dir=store_dir,
+            store_max_size=self.config["store_max_size"],
+            stream_threshold=self.config["stream_threshold"],
+        )
+
+    @staticmethod
+    def _project_path(config, path):
+        if not path:
+            return ""
+
+        # Relative paths are resolved against the mkdocs.yml directory
+        config_file = config.get("config_file_path")
+        base_dir = os.path.dirname(os.path.abspath(config_file)) if config_file else ""
+        return os.path.join(base_dir or os.getcwd(), path)
+
+    @property
+    def sharded(self) -> bool:
+        return self.config["shard_count"] > 1
+
+    def _in_shard(self, src_path: str) -> bool:
+        from .shards import shard_of
 
-        self.num_files += 1
+        return (
+            shard_of(src_path, self.config["shard_count"]) == self.config["shard_index"]
+        )
+
+    def _shard_name(self, filename: str) -> str:
+        # Shards write partial outputs under names of their own
+        if not self.sharded:
+            return filename
+        from .shards import shard_name
+
+        return shard_name(
+            filename, self.config["shard_index"], self.config["shard_count"]
+        )
+
+    def _manifest_path(self, config) -> str:
+        return os.path.join(
+            config["site_dir"], self._shard_name(self.config["manifest_file"])
+        )
+
+    @staticmethod
+    def _fingerprint(content: str, base_url: str) -> str:
+        # Hashed in slices, so that no encoded copy of a large page is made
+        digest = hashlib.sha256(f"{base_url}\0".encode("utf-8"))
+        for pos in range(0, len(content), FINGERPRINT_SLICE):
+            digest.update(content[pos : pos + FINGERPRINT_SLICE].encode("utf-8"))
+        return digest.hexdigest()
 
+    def _kept_path(self, fingerprint: str, filename: str) -> str:
+        return os.path.join(self.keep_dir, fingerprint + os.path.splitext(filename)[1])
+
+    def _sidecar_suffixes(self) -> list:
+        # The suffixes of the compressed copies written next to each export
+        compressor = self.renderer.compressor if self.renderer else None
+        return [f".{ext}" for ext in compressor.compressors] if compressor else []
+
+    def _keep_exports(self):
+        # MkDocs empties site_dir before every rebuild, so the exports of
+        # this build are kept outside of it, named after the fingerprint of
+        # their page, for the unchanged pages of the next build
+        if self.keep_dir is None:
+            import tempfile
+
+            self.keep_dir = tempfile.mkdtemp(prefix="mkdocs-text-export-keep-")
+        kept = set()
+        for filename, src_path in self.exports.items():
+            fingerprint = self.fingerprints.get(src_path)
+            if fingerprint is None:
+                continue
+            kept_path = self._kept_path(fingerprint, filename)
+            # The compressed sidecars are kept with the export, so that they
+            # are not compressed again for an unchanged page
+            for suffix in ["", *self._sidecar_suffixes()]:
+                if not os.path.exists(filename + suffix):
+                    continue
+                kept.add(os.path.basename(kept_path + suffix))
+                if os.path.exists(kept_path + suffix):
+                    continue
+                try:
+                    link_file(filename + suffix, kept_path + suffix)
+                except OSError as e:
+                    logging.debug(
+                        f"Could not keep {filename}{suffix} for the next build: {e}"
+                    )
+                    self.fingerprints.pop(src_path, None)
+        for name in os.listdir(self.keep_dir):
+            if name not in kept:
+                os.unlink(os.path.join(self.keep_dir, name))
+
+    def _unchanged(self, src_path, fingerprint, txt_paths) -> list:
+        # The kept exports of a page that did not change since the previous
+        # build, or an empty list if it has to be converted
+        if self.keep_dir is None or self.fingerprints.get(src_path) != fingerprint:
+            return []
+        kept_paths = [self._kept_path(fingerprint, path) for path in txt_paths]
+        if not all(os.path.exists(path) for path in kept_paths):
+            return []
+        return kept_paths
+
+    def _restore_unchanged(self, src_path, fingerprint, txt_paths) -> bool:
+        # Puts back the exports of an unchanged page without converting it
+        kept_paths = self._unchanged(src_path, fingerprint, txt_paths)
+        if not kept_paths:
+            return False
+        for renderer, kept_path, txt_path in zip(self.renderers, kept_paths, txt_paths):
+            if not os.path.exists(txt_path):
+                link_file(kept_path, txt_path)
+            for suffix in self._sidecar_suffixes():
+                if os.path.exists(kept_path + suffix) and not os.path.exists(
+                    txt_path + suffix
+                ):
+                    link_file(kept_path + suffix, txt_path + suffix)
+            # A sidecar that was not kept is written again
+            if renderer.compressor and not renderer.compressor.is_current(txt_path):
+                renderer.compressor.submit_file(txt_path)
+        return True
+
+    @staticmethod
+    def _page_paths(page) -> tuple:
         try:
-            abs_dest_path = page.file.abs_dest_path
-            src_path = page.file.src_path
+            return page.file.abs_dest_path, page.file.src_path
         except AttributeError:
             # Support for mkdocs <1.0
-            abs_dest_path = page.abs_output_path
-            src_path = page.input_path
+            return page.abs_output_path, page.input_path
 
+    def _export_paths(self, abs_dest_path, src_path) -> tuple:
+        # The base URL of the page and the name and path of each export
         path = os.path.dirname(abs_dest_path)
-        os.makedirs(path, exist_ok=True)
-
         filename = os.path.splitext(os.path.basename(src_path))[0]
 
-        from pathlib import Path
-        from urllib.parse import urljoin
         from urllib.request import pathname2url
 
         base_url = pathname2url(os.path.join(path, filename))
-        txt_file = f"{filename}.{self.file_ext}"
+        txt_files = [f"{filename}.{renderer.file_ext}" for renderer in self.renderers]
+        txt_paths = [os.path.join(path, txt_file) for txt_file in txt_files]
+        return base_url, txt_files, txt_paths
+
+    def on_page_content(self, html, page, config, files):
+        if not self.enabled or not self.convert_early:
+            return html
+
+        abs_dest_path, src_path = self._page_paths(page)
+        if self.page_filter and not self.page_filter.matches(src_path):
+            return html
+        if self.sharded and not self._in_shard(src_path):
+            return html
+
+        start = timer()
+        base_url, _, txt_paths = self._export_paths(abs_dest_path, src_path)
+        # The page is fingerprinted as converted, even if plugins that run
+        # later change its content; unchanged pages are skipped in on_post_page
+        fingerprint = self._fingerprint(html, base_url)
+        self.early_fingerprints[src_path] = fingerprint
+        if not self._unchanged(src_path, fingerprint, txt_paths):
+            os.makedirs(os.path.dirname(abs_dest_path), exist_ok=True)
+            self.pool.submit(src_path, page.file.url, html, base_url, txt_paths)
+            self.submitted.add(src_path)
+        self.total_time += timer() - start
+        return html
+
+    def on_post_page(self, output_content, page, config):
+        if not self.enabled:
+            return output_content
+
+        start = timer()
+
+        abs_dest_path, src_path = self._page_paths(page)
+
+        # Excluded pages are left alone before anything is parsed
+        if self.page_filter and not self.page_filter.matches(src_path):
+            self.num_excluded += 1
+            return output_content
+
+        os.makedirs(os.path.dirname(abs_dest_path), exist_ok=True)
+        base_url, txt_files, txt_paths = self._export_paths(abs_dest_path, src_path)
+
+        # Convert only the page body rendered from Markdown, without the theme
+        source = None
+        if self.config["content_only"] or self.convert_early:
+            source = getattr(page, "content", None)
+
+        fingerprint = self.early_fingerprints.get(src_path) or self._fingerprint(
+            source or output_content, base_url
+        )
+        in_shard = not self.sharded or self._in_shard(src_path)
+        if in_shard:
+            self.num_files += 1
 
         try:
-            self.renderer.write_txt(
-                output_content, base_url, os.path.join(path, txt_file)
-            )
-            output_content = self.renderer.add_link(output_content, txt_file)
-        except Exception as e:
+            with collect() as timings:
+                # All formats share the parsed page and its link injection
+                doc = self.renderer.parse(output_content)
+                text = None
+                # Whether this build exports the page from on_post_page
+                exported = False
+                if not in_shard:
+                    # Another shard exports the page, but it still counts
+                    # towards the boilerplate of the site
+                    if self.boilerplate:
+                        page_doc = (
+                            doc if source is None else self.renderer.parse(source)
+                        )
+                        with stage("convert"):
+                            self.boilerplate.add(page_doc.soup)
+                elif self.boilerplate:
+                    self._defer(
+                        doc, source, src_path, page.file.url, base_url, txt_paths
+                    )
+                elif src_path in self.submitted:
+                    # Already being converted since on_page_content
+                    pass
+                elif self._restore_unchanged(src_path, fingerprint, txt_paths):
+                    # Unchanged since the previous build of this serve session
+                    self.num_skipped += 1
+                    exported = True
+                elif self.pool:
+                    self.pool.submit(
+                        src_path, page.file.url, source or doc.html, base_url, txt_paths
+                    )
+                else:
+                    content = doc if source is None else source
+                    text = self._write_formats(src_path, content, base_url, txt_paths)
+                    exported = True
+
+                for renderer, txt_file in zip(self.renderers, txt_files):
+                    renderer.add_link(doc, txt_file)
+                output_content = doc.html
+                if self.chunks and exported:
+                    self._add_chunks(page.file.url, src_path, text, txt_paths[0])
+        except (Exception, PageTimeout) as e:
             logging.error(f"Error converting {src_path} to text: {e}")
             self.num_errors += 1
+            self.fingerprints.pop(src_path, None)
+        else:
+            # Pages of other shards are exported and recorded there
+            if in_shard:
+                self._record_page(src_path, page.file.url, base_url, txt_paths)
+                # Deferred pages depend on every other page and are never
+                # skipped, and pages exported with the fallback are retried
+                if not self.boilerplate and src_path not in self.fallback_pages:
+                    self.fingerprints[src_path] = fingerprint
+
+        self.metrics.add(src_path, timings.stages)
 
         end = timer()
         self.total_time += end - start
 
         return output_content
 
+    def _record_page(self, src_path, url, base_url, txt_paths):
+        self.page_urls[src_path] = url
+        for renderer, txt_path in zip(self.renderers, txt_paths):
+            self.exports[txt_path] = src_path
+            if self.config["combined_file"]:
+                renderer.add_doc(txt_path, base_url, url)
+
+    def _write_formats(self, src_path, content, base_url, txt_paths):
+        # Writes every format of a page and returns the text of the first one,
+        # or None if it was streamed
+        fallbacks = sum(renderer.fallbacks for renderer in self.renderers)
+        texts = [
+            renderer.write_txt(content, base_url, txt_path)
+            for renderer, txt_path in zip(self.renderers, txt_paths)
+        ]
+        if sum(renderer.fallbacks for renderer in self.renderers) > fallbacks:
+            self.fallback_pages.append(src_path)
+        return texts[0]
+
+    def _add_chunks(self, url, src_path, text, txt_path):
+        # Pages whose text is not in memory, such as streamed or unchanged
+        # pages, are chunked from their export on disk
+        if text is None:
+            self.chunks.add_file(url, src_path, txt_path)
+        else:
+            self.chunks.add_page(url, src_path, text)
+
+    def _defer(self, doc, source, src_path, url, base_url, txt_paths):
+        # The page is fingerprinted now and spooled to disk until the
+        # boilerplate of the whole site is known
+        page_doc = doc if source is None else self.renderer.parse(source)
+        with stage("convert"):
+            self.boilerplate.add(page_doc.soup)
+        spool_file = os.path.join(self.spool_dir, f"{len(self.deferred)}.html")
+        with stage("write"):
+            with open(spool_file, "w", encoding="utf-8") as f:
+                f.write(page_doc.html)
+        self.deferred.append((src_path, url, base_url, txt_paths, spool_file))
+
+    def _emit_deferred(self):
+        for src_path, url, base_url, txt_paths, spool_file in self.deferred:
+            with collect() as timings:
+                try:
+                    with open(spool_file, encoding="utf-8") as f:
+                        doc = self.renderer.parse(f.read())
+                    with stage("convert"):
+                        if self.boilerplate.strip(doc.soup):
+                            doc.mark_modified()
+                    if self._shared_kill_tags():
+                        # The tree is parsed already; remove the kill_tags
+                        # from it once for all formats
+                        self.renderer.prune(doc)
+                    if self.pool:
+                        self.pool.submit(src_path, url, doc.html, base_url, txt_paths)
+                    else:
+                        text = self._write_formats(src_path, doc, base_url, txt_paths)
+                        if self.chunks:
+                            self._add_chunks(url, src_path, text, txt_paths[0])
+                except (Exception, PageTimeout) as e:
+                    logging.error(f"Error converting {src_path} to text: {e}")
+                    self.num_errors += 1
+                    for txt_path in txt_paths:
+                        self.exports.pop(txt_path, None)
+            self.metrics.add(src_path, timings.stages)
+
+        logging.info(
+            f"Removed {self.boilerplate.removed} blocks of "
+            f"{len(self.boilerplate.boilerplate)} kinds of boilerplate "
+            f"from {self.boilerplate.num_pages} pages"
+        )
+        self._discard_deferred()
+
+    def _shared_kill_tags(self) -> bool:
+        selectors = self.renderer.kill_rules.selectors
+        return bool(selectors) and all(
+            renderer.kill_rules.selectors == selectors for renderer in self.renderers
+        )
+
+    def _discard_deferred(self):
+        if self.spool_dir:
+            shutil.rmtree(self.spool_dir, ignore_errors=True)
+        self.boilerplate = None
+        self.deferred = []
+        self.spool_dir = None
+
+    def on_build_error(self, error):
+        self._discard_deferred()
+
     def on_post_build(self, config):
         if not self.enabled:
             return
 
+        if self.boilerplate:
+            start = timer()
+            self._emit_deferred()
+            self.total_time += timer() - start
+
+        if self.pool:
+            start = timer()
+            for result in self.pool.join():
+                self.metrics.add(result.src_path, result.timings)
+                if result.error is not None:
+                    logging.error(
+                        f"Error converting {result.src_path} to text: {result.error}"
+                    )
+                    self.num_errors += 1
+                    self.fingerprints.pop(result.src_path, None)
+                    for filename in result.filenames:
+                        self.exports.pop(filename, None)
+                    continue
+                if result.fallbacks:
+                    self.fallback_pages.append(result.src_path)
+                    self.fingerprints.pop(result.src_path, None)
+                if self.chunks:
+                    self._add_chunks(
+                        result.url, result.src_path, result.text, result.filenames[0]
+                    )
+            if self.pool.broken:
+                # A worker died; start over with a fresh pool in the next build
+                self._shutdown_pool()
+            self.total_time += timer() - start
+
+        if self.chunks:
+            try:
+                self.chunks.close()
+            except OSError as e:
+                logging.error(f"Error writing chunks: {e}")
+                self.num_errors += 1
+            self.chunks = None
+
+        for renderer in self.renderers:
+            start = timer()
+            for filename, error in renderer.flush():
+                logging.error(f"Error writing {filename}: {error}")
+                self.num_errors += 1
+                # Leave the file out of the manifest and write it next time
+                src_path = self.exports.pop(filename, None)
+                self.fingerprints.pop(src_path, None)
+            if renderer.compressor:
+                for filename, error in renderer.compressor.join():
+                    logging.error(f"Error compressing {filename}: {error}")
+                    self.num_errors += 1
+            self.total_time += timer() - start
+
+        if self.serving:
+            try:
+                self._keep_exports()
+            except OSError as e:
+                logging.warning(f"Could not keep the exports for the next build: {e}")
+                self.fingerprints = {}
+
+        if self.config["combined_file"] and self.sharded:
+            logging.info("The combined file is written when the shards are merged")
+        elif self.config["combined_file"]:
+            combined_base = os.path.join(
+                config["site_dir"], self.config["combined_file"]
+            )
+            for index, renderer in enumerate(self.renderers):
+                # Further formats get their own extension, e.g. llms-full.md
+                combined_file = combined_base
+                if index > 0:
+                    combined_file = (
+                        f"{os.path.splitext(combined_base)[0]}.{renderer.file_ext}"
+                    )
+                try:
+                    renderer.write_combined(combined_file)
+                except Exception as e:
+                    logging.error(f"Error writing combined export {combined_file}: {e}")
+                    self.num_errors += 1
+
+        if self.config["manifest_file"]:
+            self._write_manifest(config)
+
         logging.info(
             f"Converting {self.num_files} files to text took {self.total_time:.1f}s"
         )
+        if self.num_skipped > 0:
+            logging.info(f"{self.num_skipped} unchanged files were skipped")
+        if self.num_excluded > 0:
+            logging.info(f"{self.num_excluded} excluded pages were not exported")
+        totals = self.metrics.totals()
+        logging.info(
+            "Time per stage: "
+            + ", ".join(f"{name} {seconds:.1f}s" for name, seconds in totals.items())
+        )
+        if self.config["slowest_pages"] > 0 and self.metrics.pages:
+            logging.info(
+                "Slowest pages (seconds):\n"
+                + self.metrics.report(self.config["slowest_pages"])
+            )
+        metrics_file = self._project_path(config, self.config["metrics_file"])
+        if metrics_file:
+            try:
+                self.metrics.write(metrics_file)
+            except OSError as e:
+                logging.error(f"Error writing metrics file {metrics_file}: {e}")
+        caches = [renderer.cache for renderer in self.renderers if renderer.cache]
+        if caches:
+            hits = sum(cache.hits for cache in caches)
+            misses = sum(cache.misses for cache in caches)
+            logging.info(f"Conversion cache: {hits} hits, {misses} misses")
+        if self.renderer.store:
+            # All formats share the store, evicting once covers them all
+            try:
+                removed = self.renderer.store.evict()
+            except OSError as e:
+                logging.warning(f"Could not clean up the shared export store: {e}")
+            else:
+                if removed:
+                    logging.debug(f"Removed {removed} unused blobs from the store")
+        if self.fallback_pages:
+            logging.warning(
+                f"{len(self.fallback_pages)} pages exceeded the conversion time or "
+                "memory budget and were exported with plain tag stripping: "
+                + ", ".join(self.fallback_pages)
+            )
         if self.num_errors > 0:
             logging.error(f"{self.num_errors} conversion errors occurred (see above)")
+
+    def _write_manifest(self, config):
+        from .manifest import build_manifest, write_manifest
+
+        manifest_file = self._manifest_path(config)
+        try:
+            manifest = build_manifest(
+                config["site_dir"], self.exports, self.previous_manifest
+            )
+            if self.sharded:
+                from .shards import shard_info
+
+                manifest.update(
+                    shard_info(
+                        self.config["shard_index"],
+                        self.config["shard_count"],
+                        self.renderer.page_order,
+                        self.page_urls,
+                        [renderer.file_ext for renderer in self.renderers],
+                        self.config["combined_file"],
+                        self.config["chunks_dir"],
+                    )
+                )
+            write_manifest(manifest_file, manifest)
+        except OSError as e:
+            logging.error(f"Error writing manifest {manifest_file}: {e}")
+            self.num_errors += 1
+            return
+
+        # The next build in this serve session diffs against this one
+        self.previous_manifest = manifest
+        changes = manifest["changes"]
+        logging.info(
+            f"Manifest: {len(changes['added'])} added, "
+            f"{len(changes['changed'])} changed, {len(changes['removed'])} removed"
+        )
@@ -0,0 +1,130 @@
+import json
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Optional
+
+from .metrics import collect
+from .watchdog import limit_memory
+
+# Renderers are cached per worker process, keyed on their options
+_renderers: dict = {}
+
+
+def _get_renderer(options: dict):
+    key = json.dumps(options, sort_keys=True)
+    renderer = _renderers.get(key)
+    if renderer is None:
+        from .renderer import Renderer
+
+        renderer = _renderers[key] = Renderer(**options)
+    return renderer
+
+
+def close_renderers():
+    # Stops the writer and compression threads of the cached renderers
+    for renderer in _renderers.values():
+        renderer.close()
+    _renderers.clear()
+
+
+def _warm_up(formats: list):
+    # Creates the renderers and loads the converter before the first page
+    for options in formats:
+        _get_renderer(options).backend.prepare()
+
+
+def _write_page(
+    formats: list, content: str, base_url: str, filenames: list, return_text: bool
+):
+    # Every format of the page is converted in the same task, so the page
+    # content is only sent to the worker once
+    texts = []
+    fallbacks = 0
+    with collect() as timings:
+        for options, filename in zip(formats, filenames):
+            renderer = _get_renderer(options)
+            before = renderer.fallbacks
+            texts.append(renderer.write_txt(content, base_url, filename))
+            fallbacks += renderer.fallbacks - before
+            for _, error in renderer.flush():
+                raise error
+            if renderer.compressor:
+                # Compression already runs off the main process here
+                for _, error in renderer.compressor.join():
+                    raise error
+    return timings.stages, texts[0] if return_text else None, fallbacks
+
+
+@dataclass
+class PageResult:
+    src_path: str
+    url: str
+    filenames: list
+    timings: dict
+    error: Optional[BaseException]
+    text: Optional[str] = None
+    fallbacks: int = 0
+
+
+class PagePool:
+    """Converts pages in a pool of worker processes.
+
+    Pages are submitted from ``on_post_page`` with one export file name per
+    output format and collected with ``join``, which returns a ``PageResult``
+    for every page. The converted text of the first format is only sent back
+    from the workers when ``return_text`` is set. ``memory_limit`` caps the
+    address space of each worker in megabytes.
+
+    The pool is meant to live for a whole ``mkdocs serve`` session: workers
+    keep their renderers, imported modules and caches between builds.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        formats: list,
+        return_text=False,
+        memory_limit: int = 0,
+    ):
+        self.formats: list = formats
+        self.return_text: bool = return_text
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=limit_memory, initargs=(memory_limit,)
+        )
+        self.pending: list[tuple[str, str, list, Future]] = []
+        self.broken: bool = False
+        # Start the workers while MkDocs is still busy rendering the pages
+        for _ in range(workers):
+            self.executor.submit(_warm_up, formats)
+
+    def submit(
+        self, src_path: str, url: str, content: str, base_url: str, filenames: list
+    ):
+        future = self.executor.submit(
+            _write_page,
+            self.formats,
+            content,
+            base_url,
+            filenames,
+            self.return_text,
+        )
+        self.pending.append((src_path, url, filenames, future))
+
+    def join(self) -> list[PageResult]:
+        results = []
+        for src_path, url, filenames, future in self.pending:
+            error = future.exception()
+            if error is None:
+                timings, text, fallbacks = future.result()
+                results.append(
+                    PageResult(src_path, url, filenames, timings, None, text, fallbacks)
+                )
+            else:
+                self.broken = self.broken or isinstance(error, BrokenProcessPool)
+                results.append(PageResult(src_path, url, filenames, {}, error))
+        self.pending = []
+        return results
+
+    def shutdown(self):
+        self.executor.shutdown(cancel_futures=True)
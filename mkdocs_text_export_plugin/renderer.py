@@ -1,11 +1,21 @@
+import json
 import logging
 import os
+import threading
 from importlib import import_module
 from importlib.util import module_from_spec, spec_from_file_location
-from pathlib import Path
-
-from html22text import html22text
+from typing import Optional
 
+from . import __version__
+from .backends import load_backend
+from .cache import ConversionCache
+from .compress import Compressor
+from .document import HtmlDocument
+from .metrics import stage
+from .rules import KillRules
+from .watchdog import PageTimeout, strip_tags, time_limit
+from .store import BlobStore
+from .writer import FileWriter, replace_file, write_atomic, write_combined
 from .themes import generic as generic_theme
 
 
@@ -22,8 +32,20 @@ class Renderer:
         hide_strikethrough: bool = False,
         kill_tags: list = [],  # type: ignore
         file_ext: str = "txt",
+        cache_dir: str = "",
+        cache_max_size: int = 256,
+        compress: list = [],  # type: ignore
+        write_behind: bool = False,
+        backend: str = "html22text",
+        timeout: float = 0.0,
+        on_timeout: str = "fallback",
+        store_dir: str = "",
+        store_max_size: int = 1024,
+        stream_threshold: int = 0,
     ):
         self.page_order: list = []
+        # The position of each URL of page_order
+        self.page_positions: dict = {}
         self.pages: list = []
         self.markdown: bool = markdown
         self.plain_tables: bool = plain_tables
@@ -32,36 +54,236 @@ class Renderer:
         self.default_image_alt: str = default_image_alt
         self.hide_strikethrough: bool = hide_strikethrough
         self.kill_tags: list = kill_tags
+        self.kill_rules = KillRules(kill_tags)
         self.theme = self._load_theme_handler(theme, theme_handler_path)
         self.file_ext: str = file_ext
-
-    def write_txt(self, content: str, base_url: str, filename: str):
-        Path(filename).write_text(self.render_doc(content, base_url))
-
-    def render_doc(self, content: str, base_url: str = ""):
-        # Convert kill_tags list to comma-separated string if needed
-        kill_tags_str = None
-        if self.kill_tags:
-            kill_tags_str = ",".join(self.kill_tags)
-
-        return html22text(
-            html_content=content,
-            markdown=self.markdown,
-            base_url=base_url,
-            open_quote=self.open_quote,
-            close_quote=self.close_quote,
-            default_image_alt=self.default_image_alt,
-            kill_strikethrough=self.hide_strikethrough,
-            kill_tags=kill_tags_str,
-            file_ext_override=self.file_ext if self.markdown else "",
+        self.backend = load_backend(
+            backend,
+            markdown=markdown,
+            plain_tables=plain_tables,
+            open_quote=open_quote,
+            close_quote=close_quote,
+            default_image_alt=default_image_alt,
+            hide_strikethrough=hide_strikethrough,
+            kill_tags=kill_tags,
+            file_ext=file_ext,
         )
+        self.timeout: float = timeout
+        self.on_timeout: str = on_timeout
+        self.fallbacks: int = 0
+        self.cache = None
+        if cache_dir:
+            self.cache = ConversionCache(
+                cache_dir, cache_max_size * 1024 * 1024, self._cache_salt()
+            )
+        self.store = None
+        self._write_file = write_atomic
+        self._replace_file = replace_file
+        if store_dir:
+            self.store = BlobStore(store_dir, store_max_size * 1024 * 1024)
+            self._write_file = self.store.write
+            self._replace_file = self.store.replace
+        # Pages above the threshold (in MB of HTML) are streamed to disk
+        self.stream_threshold: int = stream_threshold * 1024 * 1024
+        self.stream_skip = None
+        if stream_threshold > 0:
+            from .stream import skip_tags
+
+            self.stream_skip = skip_tags(kill_tags, hide_strikethrough)
+        self.compressor = Compressor(compress) if compress else None
+        self.writer = None
+        if write_behind:
+            self.writer = FileWriter(self._written, write_file=self._write_file)
+
+    def parse(self, content) -> HtmlDocument:
+        if isinstance(content, HtmlDocument):
+            return content
+        return HtmlDocument(content)
+
+    def write_txt(self, content, base_url: str, filename: str) -> Optional[str]:
+        # Streamed pages return no text; it is only on disk
+        html = content.html if isinstance(content, HtmlDocument) else content
+        if self.stream_threshold and len(html) > self.stream_threshold:
+            self._stream_txt(html, base_url, filename)
+            return None
+
+        text = self.render_doc(content, base_url)
+        self._write(filename, text.encode("utf-8"))
+        return text
+
+    def _write(self, filename: str, data: bytes):
+        with stage("write"):
+            if self.writer:
+                self.writer.write(filename, data)
+            else:
+                self._written(filename, data, self._write_file(filename, data))
+
+    def _stream_txt(self, content: str, base_url: str, filename: str):
+        # Large pages bypass the cache and the backend: the text goes to a
+        # temporary file as it is produced, which then replaces the export
+        from .stream import stream_txt
+
+        tmp = f"{filename}.{os.getpid()}.{threading.get_ident()}.stream"
+        with stage("convert"):
+            try:
+                with time_limit(self.timeout):
+                    stream_txt(
+                        content,
+                        tmp,
+                        base_url if self.markdown else "",
+                        self.markdown,
+                        self.open_quote,
+                        self.close_quote,
+                        self.default_image_alt,
+                        self.stream_skip,  # type: ignore
+                    )
+            except (PageTimeout, MemoryError) as e:
+                if self.on_timeout != "fallback":
+                    raise
+                self.fallbacks += 1
+                logging.warning(
+                    f"Conversion failed ({e or 'out of memory'}), "
+                    "falling back to plain tag stripping"
+                )
+                self._write(filename, strip_tags(content).encode("utf-8"))
+                return
+
+        with stage("write"):
+            try:
+                changed = self._replace_file(tmp, filename)
+            except BaseException:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+                raise
+        if self.compressor and (changed or not self.compressor.is_current(filename)):
+            self.compressor.submit_file(filename)
+
+    def flush(self) -> list:
+        # Waits for queued writes and returns (filename, exception) of failures
+        return self.writer.flush() if self.writer else []
+
+    def close(self):
+        # Stops the background threads once the renderer is no longer used
+        if self.writer:
+            self.writer.close()
+        if self.compressor:
+            self.compressor.shutdown()
 
-    def add_doc(self, content: str, base_url: str, rel_url: str):
-        pos = self.page_order.index(rel_url)
-        self.pages[pos] = (content, base_url, rel_url)
+    def _written(self, filename: str, data: bytes, changed: bool):
+        # Identical files are left alone, so only recompress when needed
+        if self.compressor and (changed or not self.compressor.is_current(filename)):
+            self.compressor.submit(filename, data)
 
-    def add_link(self, content: str, filename: str):
-        return self.theme.modify_html(content, filename)
+    def prune(self, doc: HtmlDocument):
+        # Removes the kill_tags from a tree that is parsed already and belongs
+        # to the conversion, so that the backend does not look for them again
+        if self.kill_rules and doc.killed is None:
+            with stage("convert"):
+                if self.kill_rules.apply(doc.soup):
+                    doc.mark_modified()
+            doc.killed = self.kill_rules.selectors
+
+    def render_doc(self, content, base_url: str = ""):
+        with stage("convert"):
+            pruned = (
+                isinstance(content, HtmlDocument)
+                and bool(self.kill_rules)
+                and content.killed == self.kill_rules.selectors
+            )
+            content = str(content)
+            try:
+                return self._render_doc(content, base_url, pruned)
+            except (PageTimeout, MemoryError) as e:
+                if self.on_timeout != "fallback":
+                    raise
+                # Fallback output is not cached, so the page is retried next time
+                self.fallbacks += 1
+                logging.warning(
+                    f"Conversion failed ({e or 'out of memory'}), "
+                    "falling back to plain tag stripping"
+                )
+                return strip_tags(content)
+
+    def _render_doc(self, content: str, base_url: str, pruned: bool = False):
+        if self.cache is None:
+            return self._convert_limited(content, base_url, pruned)
+
+        key = self.cache.key(content, base_url if self.backend.uses_base_url else "")
+        text = self.cache.get(key)
+        if text is None:
+            text = self._convert_limited(content, base_url, pruned)
+            self.cache.put(key, text)
+        return text
+
+    def _convert_limited(self, content: str, base_url: str, pruned: bool = False):
+        with time_limit(self.timeout):
+            if pruned:
+                return self._convert_pruned(content, base_url)
+            return self._convert(content, base_url)
+
+    def _convert(self, content: str, base_url: str = ""):
+        return self.backend.convert(content, base_url)
+
+    def _convert_pruned(self, content: str, base_url: str = ""):
+        return self.backend.convert_pruned(content, base_url)
+
+    def add_doc(self, filename: str, base_url: str, rel_url: str):
+        # Only the path of the converted page is kept; its text stays on disk
+        # until write_combined streams it into the combined file
+        pos = self.page_positions.get(rel_url)
+        if pos is None:
+            # Pages that are not in the navigation are not part of the export
+            return
+        self.pages[pos] = (filename, base_url, rel_url)
+
+    def write_combined(self, filename: str):
+        write_combined(filename, [page[0] for page in self.pages if page is not None])
+
+    def add_link(self, content, filename: str):
+        with stage("inject"):
+            return self._add_link(content, filename)
+
+    def _add_link(self, content, filename: str):
+        # Splice the link into the markup without parsing when the handler can
+        # locate the insertion point unambiguously
+        if hasattr(self.theme, "inject_html"):
+            html = self.theme.inject_html(str(content), filename)
+            if html is not None:
+                if isinstance(content, HtmlDocument):
+                    # Keep the document current for further links
+                    content.update(html)
+                return html
+
+        # Handlers that implement modify_soup work on the shared parsed tree
+        if isinstance(content, HtmlDocument) and hasattr(self.theme, "modify_soup"):
+            self.theme.modify_soup(content.soup, filename)
+            content.mark_modified()
+            return content.html
+        html = self.theme.modify_html(str(content), filename)
+        if isinstance(content, HtmlDocument):
+            content.update(html)
+        return html
+
+    def _cache_salt(self) -> str:
+        # Every option that changes the converted text must be part of the key
+        return json.dumps(
+            {
+                "plugin": __version__,
+                "backend": self.backend.name,
+                "backend_version": self.backend.version,
+                "markdown": self.markdown,
+                "plain_tables": self.plain_tables,
+                "open_quote": self.open_quote,
+                "close_quote": self.close_quote,
+                "default_image_alt": self.default_image_alt,
+                "hide_strikethrough": self.hide_strikethrough,
+                "kill_tags": self.kill_tags,
+                "file_ext": self.file_ext,
+            },
+            sort_keys=True,
+        )
 
     @staticmethod
     def _load_theme_handler(theme: str, custom_handler_path: str = None):  # type: ignore
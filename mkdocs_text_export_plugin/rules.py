@@ -0,0 +1,64 @@
+import fnmatch
+import re
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+
+class KillRules:
+    """The ``kill_tags`` selectors, compiled once into a single CSS selector.
+
+    ``apply`` removes every matching element in one walk of the tree, instead
+    of running each selector against the page separately.
+    """
+
+    def __init__(self, selectors: list):
+        self.selectors: list = [s.strip() for s in selectors if s.strip()]
+        self.pattern = None
+        if self.selectors:
+            import soupsieve
+
+            try:
+                self.pattern = soupsieve.compile(", ".join(self.selectors))
+            except soupsieve.SelectorSyntaxError as e:
+                raise ValueError(f"Invalid kill_tags selector: {e}")
+
+    def __bool__(self) -> bool:
+        return self.pattern is not None
+
+    def apply(self, soup: "BeautifulSoup") -> int:
+        removed = 0
+        for element in self.pattern.select(soup) if self.pattern else []:
+            # Matches inside an element removed before are already gone
+            if not element.decomposed:
+                element.decompose()
+                removed += 1
+        return removed
+
+
+class PageFilter:
+    """Glob patterns that select the pages to export, compiled into one regex.
+
+    A page is exported if it matches one of ``include`` (or ``include`` is
+    empty) and none of ``exclude``. ``*`` also matches ``/``.
+    """
+
+    def __init__(self, include: list = [], exclude: list = []):  # type: ignore
+        self.include = self._compile(include)
+        self.exclude = self._compile(exclude)
+
+    @staticmethod
+    def _compile(patterns: list):
+        if not patterns:
+            return None
+        return re.compile("|".join(fnmatch.translate(p) for p in patterns))
+
+    def __bool__(self) -> bool:
+        return self.include is not None or self.exclude is not None
+
+    def matches(self, path: str) -> bool:
+        path = path.replace("\\", "/")
+        if self.include is not None and not self.include.match(path):
+            return False
+        return self.exclude is None or not self.exclude.match(path)
@@ -0,0 +1,147 @@
+import glob
+import hashlib
+import logging
+import os
+import shutil
+
+from .manifest import build_manifest, load_manifest, write_manifest
+from .writer import write_combined
+
+# Compressed files that are copied along with an export
+SIDECARS = (".gz", ".br")
+
+
+def shard_of(key: str, count: int) -> int:
+    # A stable hash, unlike hash(), gives the same shard in every process
+    digest = hashlib.sha1(key.replace(os.sep, "/").encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count
+
+
+def shard_name(filename: str, index: int, count: int) -> str:
+    """The name of a partial output of shard ``index``.
+
+    ``text-export-manifest.json`` becomes
+    ``text-export-manifest.shard-1-of-4.json`` for the second of four shards.
+    """
+    stem, ext = os.path.splitext(filename)
+    return f"{stem}.shard-{index}-of-{count}{ext}"
+
+
+def shard_info(
+    index: int,
+    count: int,
+    page_order: list,
+    pages: dict,
+    formats: list,
+    combined_file: str = "",
+    chunks_dir: str = "",
+) -> dict:
+    # What the merge needs on top of the files of a partial manifest: the
+    # navigation order of all pages and the URL of every page of the shard
+    return {
+        "shard": {"index": index, "count": count},
+        "page_order": page_order,
+        "pages": pages,
+        "formats": formats,
+        "combined_file": combined_file,
+        "chunks_dir": chunks_dir,
+    }
+
+
+def _copy(src: str, dest: str):
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    shutil.copy2(src, dest)
+
+
+def merge_shards(
+    site_dir: str,
+    manifest_file: str,
+    shard_dirs: list = [],  # type: ignore
+    combined_file: str = "",
+) -> dict:
+    """Combine the outputs of a sharded export into ``site_dir``.
+
+    Reads the partial manifests that every shard wrote next to
+    ``manifest_file``, either in ``site_dir`` or in one of ``shard_dirs``, and
+    copies the exports of the shards found elsewhere into ``site_dir``. Writes
+    the combined file of every format in navigation order and the manifest of
+    the whole site, then removes the partial manifests. Raises ``ValueError``
+    if a shard is missing.
+    """
+    pattern = glob.escape(os.path.splitext(manifest_file)[0]) + ".shard-*-of-*"
+    pattern += os.path.splitext(manifest_file)[1]
+    partials = []
+    for shard_dir in shard_dirs or [site_dir]:
+        for filename in sorted(
+            glob.glob(os.path.join(glob.escape(shard_dir), pattern))
+        ):
+            manifest = load_manifest(filename)
+            if "shard" not in manifest:
+                raise ValueError(f"{filename} is not a partial manifest")
+            partials.append((shard_dir, filename, manifest))
+    if not partials:
+        raise ValueError(f"No partial manifests of {manifest_file} found")
+
+    counts = {manifest["shard"]["count"] for _, _, manifest in partials}
+    if len(counts) != 1:
+        raise ValueError(
+            f"Expected the partial manifests of one sharded export in {manifest_file}"
+        )
+    count = counts.pop()
+    missing = set(range(count)) - {m["shard"]["index"] for _, _, m in partials}
+    if missing:
+        shards = ", ".join(map(str, sorted(missing)))
+        raise ValueError(f"Missing partial manifests of shards {shards}")
+
+    exports = {}
+    urls = {}
+    for shard_dir, _, manifest in partials:
+        copy = os.path.abspath(shard_dir) != os.path.abspath(site_dir)
+        for path, entry in manifest["files"].items():
+            filename = os.path.join(site_dir, path)
+            if copy:
+                _copy(os.path.join(shard_dir, path), filename)
+                for sidecar in SIDECARS:
+                    if os.path.exists(os.path.join(shard_dir, path + sidecar)):
+                        _copy(
+                            os.path.join(shard_dir, path + sidecar), filename + sidecar
+                        )
+            exports[filename] = entry["src_path"]
+        urls.update(manifest["pages"])
+        chunks_dir = manifest.get("chunks_dir")
+        if copy and chunks_dir:
+            # Every shard names its chunk files after itself
+            prefix = shard_name("chunks", **manifest["shard"])
+            chunks = os.path.join(
+                glob.escape(shard_dir), chunks_dir, f"{prefix}-*.jsonl"
+            )
+            for name in glob.glob(chunks):
+                _copy(name, os.path.join(site_dir, chunks_dir, os.path.basename(name)))
+
+    first = partials[0][2]
+    combined_file = combined_file or first.get("combined_file", "")
+    if combined_file:
+        order = {url: pos for pos, url in enumerate(first["page_order"])}
+        # Pages that are not in the navigation are not part of the export
+        ordered = sorted(
+            (order[urls[src_path]], filename)
+            for filename, src_path in exports.items()
+            if urls.get(src_path) in order
+        )
+        combined_base = os.path.join(site_dir, combined_file)
+        for index, ext in enumerate(first["formats"]):
+            filename = combined_base
+            if index > 0:
+                filename = f"{os.path.splitext(combined_base)[0]}.{ext}"
+            write_combined(
+                filename, [name for _, name in ordered if name.endswith(f".{ext}")]
+            )
+
+    final = os.path.join(site_dir, manifest_file)
+    manifest = build_manifest(site_dir, exports, load_manifest(final))
+    write_manifest(final, manifest)
+    for shard_dir, filename, _ in partials:
+        if os.path.abspath(shard_dir) == os.path.abspath(site_dir):
+            os.unlink(filename)
+    logging.info(f"Merged {len(exports)} exports of {count} shards into {site_dir}")
+    return manifest
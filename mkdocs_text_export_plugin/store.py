@@ -0,0 +1,131 @@
+import errno
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+
+from .manifest import _sha256
+from .writer import link_file, replace_file, write_atomic
+
+
+class BlobStore:
+    """A content-addressed store of export files shared between builds.
+
+    Every file written through ``write`` is kept once under the hash of its
+    bytes, and the export is a hard link to that blob. Sites built from the
+    same sources, such as one build per version or language, then share a
+    single copy of every identical export. Where hard links are not possible
+    (another file system, or no permission), files are written as copies.
+    """
+
+    def __init__(self, store_dir: str, max_size: int):
+        self.store_dir: Path = Path(store_dir)
+        self.max_size: int = max_size
+        self.can_link: bool = True
+        self.linked: int = 0
+        self.stored: int = 0
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+
+    def write(self, filename: str, data: bytes) -> bool:
+        # Same contract as write_atomic: returns whether the file changed
+        if not self.can_link:
+            return write_atomic(filename, data)
+
+        blob = self._path(hashlib.sha256(data).hexdigest())
+        return self._link(
+            blob,
+            filename,
+            lambda: self._store(blob, data),
+            lambda: write_atomic(filename, data),
+        )
+
+    def replace(self, tmp: str, filename: str) -> bool:
+        # Same contract as replace_file, for data that is not held in memory
+        if not self.can_link:
+            return replace_file(tmp, filename)
+
+        try:
+            blob = self._path(_sha256(tmp))
+            return self._link(
+                blob,
+                filename,
+                lambda: self._store_file(blob, tmp),
+                lambda: replace_file(tmp, filename),
+            )
+        finally:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+    def _link(self, blob: Path, filename: str, store, fallback) -> bool:
+        # Links filename to blob; store() writes the blob and fallback() writes
+        # filename as a copy where links are not possible
+        if not blob.exists():
+            store()
+        try:
+            if os.path.samefile(blob, filename):
+                return False
+        except OSError:
+            pass
+
+        tmp = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            try:
+                os.link(blob, tmp)
+            except FileNotFoundError:
+                # Another build evicted the blob since it was checked
+                store()
+                os.link(blob, tmp)
+            os.replace(tmp, filename)
+        except OSError as e:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                raise
+            logging.debug(f"Cannot link exports to {self.store_dir}, copying: {e}")
+            self.can_link = False
+            return fallback()
+        self.linked += 1
+        return True
+
+    def evict(self) -> int:
+        """Remove blobs no export links to, oldest first, down to the cap.
+
+        Returns the number of removed blobs.
+        """
+        blobs = []
+        size = 0
+        for path in self.store_dir.glob("??/*"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            size += stat.st_size
+            if stat.st_nlink == 1:
+                blobs.append((stat.st_mtime, stat.st_size, path))
+
+        removed = 0
+        for _, blob_size, path in sorted(blobs, key=lambda blob: blob[0]):
+            if size <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            size -= blob_size
+            removed += 1
+        return removed
+
+    def _store(self, blob: Path, data: bytes):
+        blob.parent.mkdir(exist_ok=True)
+        write_atomic(str(blob), data)
+        self.stored += 1
+
+    def _store_file(self, blob: Path, filename: str):
+        blob.parent.mkdir(exist_ok=True)
+        link_file(filename, str(blob))
+        self.stored += 1
+
+    def _path(self, digest: str) -> Path:
+        return self.store_dir / digest[:2] / digest
@@ -0,0 +1,230 @@
+import logging
+import os
+import re
+import threading
+from typing import Callable
+
+# Size of the pieces of HTML fed to the parser at a time
+WINDOW = 1024 * 1024
+
+_VOID_TAGS = {
+    "area",
+    "base",
+    "br",
+    "col",
+    "embed",
+    "hr",
+    "img",
+    "input",
+    "link",
+    "meta",
+    "source",
+    "track",
+    "wbr",
+}
+_TAG_NAME = re.compile(r"[a-zA-Z][a-zA-Z0-9-]*")
+# Open elements whose end tag may be left out, and the start tags that end them
+_CLOSES_P = {
+    "address",
+    "article",
+    "aside",
+    "blockquote",
+    "dd",
+    "div",
+    "dl",
+    "dt",
+    "fieldset",
+    "footer",
+    "form",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "header",
+    "hr",
+    "li",
+    "main",
+    "nav",
+    "ol",
+    "p",
+    "pre",
+    "section",
+    "table",
+    "ul",
+}
+# Elements that do not stop the search for an element ended by a start tag
+_PHRASING = {
+    "a",
+    "abbr",
+    "b",
+    "bdi",
+    "bdo",
+    "big",
+    "cite",
+    "code",
+    "data",
+    "del",
+    "dfn",
+    "em",
+    "font",
+    "i",
+    "ins",
+    "kbd",
+    "label",
+    "mark",
+    "q",
+    "s",
+    "samp",
+    "small",
+    "span",
+    "strike",
+    "strong",
+    "sub",
+    "sup",
+    "time",
+    "tt",
+    "u",
+    "var",
+}
+_ENDED_BY = {
+    "p": _CLOSES_P,
+    "li": {"li"},
+    "dt": {"dt", "dd"},
+    "dd": {"dt", "dd"},
+    "option": {"option", "optgroup"},
+    "tr": {"tr"},
+    "td": {"td", "th", "tr"},
+    "th": {"td", "th", "tr"},
+}
+
+
+def _converter_class():
+    # Imported on first use, like the backends
+    import html2text
+
+    class StreamingConverter(html2text.HTML2Text):
+        """html2text that hands its output to ``write`` as it is produced.
+
+        Elements named in ``skip_tags`` are left out with their content. The
+        open elements are tracked with the end tags that HTML allows to leave
+        out, so that a skipped element ends where a browser would end it.
+        """
+
+        def __init__(self, write: Callable[[str], None], skip_tags: set, **kwargs):
+            super().__init__(**kwargs)
+            self.write = write
+            self.skip_tags: set = skip_tags
+            self.open_tags: list = []
+            # Depth of the open skipped element in open_tags, if any
+            self.skip_from = None
+
+        def outtextf(self, s: str):
+            if s:
+                self.lastWasNL = s[-1] == "\n"
+                self.write(s.replace("&nbsp_place_holder;", " "))
+
+        def _close(self, depth: int):
+            del self.open_tags[depth:]
+            if self.skip_from is not None and depth <= self.skip_from:
+                self.skip_from = None
+
+        def _end_implied(self, tag: str):
+            # Ends the open elements that the start tag ends without an end tag
+            depth = len(self.open_tags) - 1
+            while depth >= 0:
+                open_tag = self.open_tags[depth]
+                if tag in _ENDED_BY.get(open_tag, ()):
+                    self._close(depth)
+                elif open_tag not in _PHRASING:
+                    return
+                depth -= 1
+
+        def handle_starttag(self, tag, attrs):
+            self._end_implied(tag)
+            if tag not in _VOID_TAGS:
+                self.open_tags.append(tag)
+                if self.skip_from is None and tag in self.skip_tags:
+                    self.skip_from = len(self.open_tags) - 1
+            if self.skip_from is None and tag not in self.skip_tags:
+                super().handle_starttag(tag, attrs)
+
+        def handle_endtag(self, tag):
+            skipping = self.skip_from is not None
+            if tag in self.open_tags:
+                depth = len(self.open_tags) - 1 - self.open_tags[::-1].index(tag)
+                self._close(depth)
+            if not skipping and tag not in self.skip_tags:
+                super().handle_endtag(tag)
+
+        def handle_data(self, data, entity_char=False):
+            if self.skip_from is None:
+                super().handle_data(data, entity_char)
+
+        def handle_charref(self, c):
+            if self.skip_from is None:
+                super().handle_charref(c)
+
+        def handle_entityref(self, c):
+            if self.skip_from is None:
+                super().handle_entityref(c)
+
+    return StreamingConverter
+
+
+def skip_tags(kill_tags: list, hide_strikethrough: bool = False) -> set:
+    # Only plain tag names can be matched on a stream of tags
+    tags = {tag.strip().lower() for tag in kill_tags}
+    selectors = {tag for tag in tags if not _TAG_NAME.fullmatch(tag)}
+    if selectors:
+        logging.warning(
+            "Streamed pages only remove kill_tags given as tag names, "
+            f"not {', '.join(sorted(selectors))}"
+        )
+    if hide_strikethrough:
+        tags |= {"del", "s", "strike"}
+    return tags - selectors
+
+
+def stream_txt(
+    content: str,
+    filename: str,
+    base_url: str = "",
+    markdown: bool = False,
+    open_quote: str = "“",
+    close_quote: str = "”",
+    default_image_alt: str = "",
+    skip: set = set(),  # type: ignore
+) -> int:
+    """Convert ``content`` with html2text and write the text to ``filename``.
+
+    The HTML is fed to the parser in windows of ``WINDOW`` characters, and the
+    text is written as it is produced, so neither a parsed tree nor the whole
+    text is held in memory. Returns the number of bytes written.
+    """
+    tmp = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            converter = _converter_class()(f.write, skip, baseurl=base_url, bodywidth=0)
+            converter.open_quote = open_quote
+            converter.close_quote = close_quote
+            converter.default_image_alt = default_image_alt
+            if not markdown:
+                converter.ignore_links = True
+                converter.ignore_images = True
+                converter.ignore_emphasis = True
+            converter.start = True
+            for pos in range(0, len(content), WINDOW):
+                converter.feed(content[pos : pos + WINDOW])
+            converter.feed("")
+            converter.finish()
+        size = os.path.getsize(tmp)
+        os.replace(tmp, filename)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return size
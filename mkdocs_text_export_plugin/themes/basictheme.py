@@ -1,15 +1,30 @@
-from bs4 import BeautifulSoup
+from html import escape
+from typing import TYPE_CHECKING, Optional
+
+from ..inject import insert_before_end_tag
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
 
 
 def get_stylesheet() -> str:
     return ""
 
 
-def modify_html(html: str, href: str) -> str:
-    soup = BeautifulSoup(html, "html.parser")
+def inject_html(html: str, href: str) -> Optional[str]:
+    link = f'<link href="{escape(href)}" rel="alternate" title="Text export"/>'
+    return insert_before_end_tag(html, "head", link)
+
 
+def modify_soup(soup: "BeautifulSoup", href: str):
     if soup.head:
         link = soup.new_tag("link", href=href, rel="alternate", title="Text export")
         soup.head.append(link)
 
+
+def modify_html(html: str, href: str) -> str:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    modify_soup(soup, href)
     return str(soup)
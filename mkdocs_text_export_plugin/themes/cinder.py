@@ -1,13 +1,25 @@
-from bs4 import BeautifulSoup
+from html import escape
+from typing import TYPE_CHECKING, Optional
+
+from ..inject import insert_after_start_tag
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
 
 
 def get_stylesheet() -> str:
     return ""
 
 
-def modify_html(html: str, href: str) -> str:
-    soup = BeautifulSoup(html, "html.parser")
+def inject_html(html: str, href: str) -> Optional[str]:
+    a = (
+        f'<a class="txt-download" download href="{escape(href)}" '
+        'title="Text export">Open text</a>'
+    )
+    return insert_after_start_tag(html, "footer", f"<small>{a}</small>")
+
 
+def modify_soup(soup: "BeautifulSoup", href: str):
     sm_wrapper = soup.new_tag("small")
 
     a = soup.new_tag("a", href=href, title="Text export", download=None)
@@ -20,4 +32,10 @@ def modify_html(html: str, href: str) -> str:
         if footer:
             footer.insert(0, sm_wrapper)
 
+
+def modify_html(html: str, href: str) -> str:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    modify_soup(soup, href)
     return str(soup)
@@ -0,0 +1,80 @@
+import logging
+import re
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from html import unescape
+
+
+class PageTimeout(BaseException):
+    # Not an Exception, so that converters which catch every Exception
+    # cannot swallow it
+    pass
+
+
+@contextmanager
+def time_limit(seconds: float):
+    """Raise ``PageTimeout`` in the block once ``seconds`` have passed.
+
+    The limit relies on ``SIGALRM`` and is only enforced in the main thread of
+    a process on platforms that have it; elsewhere the block runs unlimited.
+    If the block catches the exception and returns anyway, it is raised again
+    when the block ends.
+    """
+    if (
+        seconds <= 0
+        or not hasattr(signal, "setitimer")
+        or threading.current_thread() is not threading.main_thread()
+    ):
+        yield
+        return
+
+    def alarm(signum, frame):
+        raise PageTimeout(f"conversion took longer than {seconds:g}s")
+
+    deadline = time.monotonic() + seconds
+    previous = signal.signal(signal.SIGALRM, alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+    if time.monotonic() >= deadline:
+        raise PageTimeout(f"conversion took longer than {seconds:g}s")
+
+
+def limit_memory(megabytes: int):
+    # Used as the initializer of worker processes: allocations beyond the limit
+    # raise MemoryError in the worker instead of exhausting the build machine
+    if megabytes <= 0:
+        return
+    try:
+        import resource
+
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        limit = megabytes * 1024 * 1024
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    except (ImportError, ValueError, OSError) as e:
+        logging.warning(f"Could not limit the memory of conversion workers: {e}")
+
+
+_COMMENT = re.compile(r"<!--.*?-->", re.S)
+_INVISIBLE = re.compile(r"<(head|script|style|template)\b.*?</\1\s*>", re.I | re.S)
+_BREAK = re.compile(
+    r"</?(?:article|aside|blockquote|br|dd|div|dl|dt|footer|h[1-6]|header|hr|li|"
+    r"nav|ol|p|pre|section|table|tr|ul)\b[^>]*>",
+    re.I,
+)
+_TAG = re.compile(r"<[^>]*>")
+
+
+def strip_tags(html: str) -> str:
+    """A cheap text extractor for pages that the converter cannot handle."""
+    text = _INVISIBLE.sub("", _COMMENT.sub("", html))
+    text = unescape(_TAG.sub("", _BREAK.sub("\n", text)))
+    lines = (" ".join(line.split()) for line in text.split("\n"))
+    return "".join(f"{line}\n" for line in lines if line)
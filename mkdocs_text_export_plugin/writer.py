@@ -0,0 +1,154 @@
+import os
+import queue
+import shutil
+import threading
+from typing import Callable, Optional
+
+
+def write_atomic(filename: str, data: bytes) -> bool:
+    """Write ``data`` unless the file already holds exactly these bytes.
+
+    The data goes to a temporary file in the same directory that is then
+    renamed over the target, so readers never see a partially written file.
+    Returns whether the file was written.
+    """
+    try:
+        if os.path.getsize(filename) == len(data):
+            with open(filename, "rb") as f:
+                if f.read() == data:
+                    return False
+    except OSError:
+        pass
+
+    tmp = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, filename)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return True
+
+
+def _same_bytes(first: str, second: str, block_size: int = 1024 * 1024) -> bool:
+    try:
+        if os.path.getsize(first) != os.path.getsize(second):
+            return False
+        with open(first, "rb") as a, open(second, "rb") as b:
+            while True:
+                block = a.read(block_size)
+                if block != b.read(block_size):
+                    return False
+                if not block:
+                    return True
+    except OSError:
+        return False
+
+
+def replace_file(tmp: str, filename: str) -> bool:
+    """Move the finished temporary file ``tmp`` over ``filename``.
+
+    Like ``write_atomic``, for data that is on disk instead of in memory: if
+    ``filename`` already holds exactly these bytes, it is left alone and
+    ``tmp`` is removed. The files are compared block by block. Returns whether
+    the file was replaced.
+    """
+    if _same_bytes(tmp, filename):
+        os.unlink(tmp)
+        return False
+    os.replace(tmp, filename)
+    return True
+
+
+def link_file(src: str, dest: str):
+    """Make ``dest`` a hard link to ``src``, or a copy where links fail.
+
+    ``dest`` is replaced atomically, like in ``write_atomic``.
+    """
+    tmp = f"{dest}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        try:
+            os.link(src, tmp)
+        except OSError:
+            shutil.copy2(src, tmp)
+        os.replace(tmp, dest)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def write_combined(filename: str, filenames: list):
+    """Concatenate the existing files of ``filenames``, separated by blank lines.
+
+    The files are streamed from disk, so their text is never held in memory.
+    """
+    with open(filename, "wb") as combined:
+        separator = b""
+        for name in filenames:
+            if not os.path.exists(name):
+                continue
+            combined.write(separator)
+            with open(name, "rb") as f:
+                shutil.copyfileobj(f, combined)
+            separator = b"\n\n"
+
+
+class FileWriter:
+    """Writes files behind the caller's back on a dedicated I/O thread.
+
+    ``write`` only queues the data; ``flush`` waits until everything queued
+    so far is on disk and returns the file name and exception of every failed
+    write. ``on_written(filename, data, changed)`` is called on the I/O thread
+    after each successful write. ``write_file`` does the actual writing and
+    returns whether the file changed.
+    """
+
+    def __init__(
+        self,
+        on_written: Optional[Callable[[str, bytes, bool], None]] = None,
+        max_pending: int = 256,
+        write_file: Callable[[str, bytes], bool] = write_atomic,
+    ):
+        self.on_written = on_written
+        self.write_file = write_file
+        self.queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self.errors: list[tuple[str, BaseException]] = []
+        self.thread = threading.Thread(
+            target=self._run, name="text-export-writer", daemon=True
+        )
+        self.thread.start()
+
+    def write(self, filename: str, data: bytes):
+        self.queue.put((filename, data))
+
+    def flush(self) -> list[tuple[str, BaseException]]:
+        self.queue.join()
+        errors, self.errors = self.errors, []
+        return errors
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                filename, data = item
+                try:
+                    changed = self.write_file(filename, data)
+                    if self.on_written:
+                        self.on_written(filename, data, changed)
+                except Exception as e:
+                    self.errors.append((filename, e))
+            finally:
+                self.queue.task_done()
@@ -0,0 +1,11 @@
+import pytest
+
+from mkdocs_text_export_plugin.cache import MEMO
+
+
+@pytest.fixture(autouse=True)
+def clear_conversion_memo():
+    """Keep conversions memoized by one test from leaking into the next."""
+    MEMO.clear()
+    yield
+    MEMO.clear()
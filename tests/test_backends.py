@@ -0,0 +1,98 @@
+import pytest
+
+from mkdocs_text_export_plugin.backends import (
+    Backend,
+    Html22TextBackend,
+    load_backend,
+)
+from mkdocs_text_export_plugin.renderer import Renderer
+
+# The HTML fixtures of the renderer and plugin tests
+FIXTURES = [
+    "<html><head><title>Home</title></head>"
+    "<body><h1>Home</h1><p>This is a test.</p><footer>Footer</footer></body></html>",
+    "<h1>Home</h1><p>This is a test.</p>",
+    "<h1>Home</h1><p>This is a  тест with <a href='http://example.com'>a link</a>.</p>",
+    "<html><body><p>No head here</p></body></html>",
+    "<nav>Navigation</nav><main><h1>Home</h1><p>This is a test.</p></main>",
+]
+
+
+class UpperBackend(Backend):
+    name = "upper"
+
+    def convert(self, content: str, base_url: str = "") -> str:
+        return content.upper()
+
+
+class IncompleteBackend(Backend):
+    name = "incomplete"
+
+
+def _words(text: str) -> str:
+    return " ".join(text.split())
+
+
+@pytest.mark.parametrize("html", FIXTURES)
+def test_backends_are_equivalent(html):
+    """Test that the lxml backend extracts the same text as html22text."""
+    pytest.importorskip("html22text")
+    pytest.importorskip("lxml")
+    expected = Html22TextBackend().convert(html)
+    assert _words(load_backend("lxml").convert(html)) == _words(expected)
+
+
+def test_lxml_backend_structure():
+    """Test that the lxml backend keeps headings, lists, code and quotes apart."""
+    pytest.importorskip("lxml")
+    html = (
+        "<head><style>p {}</style></head><h2>List</h2>"
+        "<ul><li>One</li><li>Two<ul><li>Nested</li></ul></li></ul>"
+        "<blockquote><p>Quoted</p><p>twice</p></blockquote>"
+        "<pre><code>x = 1\n\ny = 2</code></pre>"
+        "<p><q>Hi</q> <img src='a.png'> <del>old</del><!-- note --></p>"
+    )
+    backend = load_backend("lxml", hide_strikethrough=True, default_image_alt="image")
+    assert backend.convert(html) == (
+        "## List\n\n"
+        "  * One\n"
+        "  * Two\n"
+        "      * Nested\n\n"
+        "> Quoted\n>\n> twice\n\n"
+        "    x = 1\n\n    y = 2\n\n"
+        "“Hi” image\n"
+    )
+    assert backend.convert("") == ""
+
+
+def test_lxml_backend_kill_tags():
+    """Test that kill_tags elements are removed before conversion."""
+    pytest.importorskip("lxml")
+    backend = load_backend("lxml", kill_tags=["nav", "footer"])
+    assert backend.convert(FIXTURES[4]) == "# Home\n\nThis is a test.\n"
+
+
+def test_load_backend():
+    """Test loading registered and custom backends and rejecting others."""
+    assert isinstance(load_backend("html22text"), Html22TextBackend)
+    backend = load_backend(f"{__name__}:UpperBackend", markdown=True)
+    assert backend.markdown
+    assert backend.convert("<p>a</p>") == "<P>A</P>"
+    with pytest.raises(ValueError):
+        load_backend("nonexistent")
+    with pytest.raises(ValueError, match="abstract"):
+        load_backend(f"{__name__}:IncompleteBackend")
+    with pytest.raises(ValueError):
+        load_backend("lxml", markdown=True)
+
+
+def test_renderer_uses_backend(tmp_path):
+    """Test that the renderer converts with its backend and keys its cache on it."""
+    renderer = Renderer(
+        theme="mkdocs",
+        backend=f"{__name__}:UpperBackend",
+        cache_dir=str(tmp_path / "cache"),
+    )
+    assert renderer.render_doc("<p>a</p>") == "<P>A</P>"
+    other = Renderer(theme="mkdocs", cache_dir=str(tmp_path / "cache"))
+    assert renderer._cache_salt() != other._cache_salt()
@@ -0,0 +1,37 @@
+from benchmarks.bench_export import percentile, run_benchmarks
+from benchmarks.synthetic_site import generate_site, write_site
+
+
+def test_generate_site_is_deterministic():
+    """Test that the same seed produces the same synthetic site."""
+    first = generate_site(3, seed=1, table_rows=2)
+    second = generate_site(3, seed=1, table_rows=2)
+    assert [p.content for p in first] == [p.content for p in second]
+    assert "<table>" in first[0].content
+    assert 'class="admonition' in first[0].content
+
+
+def test_write_site(tmp_path):
+    """Test that the synthetic site is written as a MkDocs project."""
+    write_site(str(tmp_path), generate_site(2, table_rows=2))
+    assert (tmp_path / "mkdocs.yml").exists()
+    assert len(list((tmp_path / "docs").rglob("*.md"))) == 2
+
+
+def test_percentile():
+    """Test the latency percentile helper."""
+    assert percentile([3, 1, 2], 0.5) == 2
+    assert percentile([], 0.9) == 0.0
+
+
+def test_run_benchmarks_report():
+    """Test that a small benchmark run reports every stage."""
+    results = run_benchmarks(pages=2, sections=1, table_rows=2)
+    stages = results["stages"]
+    assert stages["render_doc"]["pages"] == 2
+    assert set(stages["modify_html"]) == {"generic", "mkdocs", "material", "cinder"}
+    assert set(stages["add_link"]) == set(stages["modify_html"])
+    assert stages["on_post_page"]["errors"] == 0
+    assert stages["on_post_page"]["latency_ms"]["p50"] >= 0
+    assert stages["on_post_page"]["peak_rss_bytes"] > 0
+    assert stages["on_post_page"]["peak_children_rss_bytes"] >= 0
@@ -0,0 +1,48 @@
+from bs4 import BeautifulSoup
+
+from mkdocs_text_export_plugin.boilerplate import BoilerplateIndex
+
+BANNER = "<div class='banner'><p>This site uses cookies to improve things.</p></div>"
+
+
+def _page(body: str) -> BeautifulSoup:
+    return BeautifulSoup(f"<body>{BANNER}{body}</body>", "html.parser")
+
+
+def test_boilerplate_index_strips_repeated_blocks():
+    """Test that blocks on more than the threshold of pages are removed."""
+    index = BoilerplateIndex(0.5)
+    pages = [_page(f"<p>Unique content of page number {i}.</p>") for i in range(4)]
+    for soup in pages:
+        index.add(soup)
+
+    assert index.strip(pages[0]) == 1
+    assert "cookies" not in str(pages[0])
+    assert "page number 0" in str(pages[0])
+    assert index.removed == 1
+
+
+def test_boilerplate_index_keeps_rare_and_short_blocks():
+    """Test that blocks below the threshold or minimum length are kept."""
+    index = BoilerplateIndex(0.5)
+    pages = [
+        _page("<p>Shared by two of the pages only.</p><p>Note</p>"),
+        _page("<p>Shared by two of the pages only.</p><p>Note</p>"),
+        BeautifulSoup("<p>Note</p><p>A page without the banner.</p>", "html.parser"),
+        BeautifulSoup("<p>Note</p><p>Another page without it.</p>", "html.parser"),
+        BeautifulSoup("<p>Note</p><p>A third page without it.</p>", "html.parser"),
+    ]
+    for soup in pages:
+        index.add(soup)
+
+    assert index.strip(pages[0]) == 0
+    assert "Shared by two" in str(pages[0])
+    assert "Note" in str(pages[0])
+
+
+def test_boilerplate_index_needs_two_pages():
+    """Test that nothing is removed from a single page."""
+    index = BoilerplateIndex(0.1)
+    soup = _page("")
+    index.add(soup)
+    assert index.strip(soup) == 0
@@ -0,0 +1,79 @@
+import os
+
+from mkdocs_text_export_plugin.cache import MEMO, ConversionCache, ConversionMemo
+
+
+def test_cache_roundtrip(tmp_path):
+    """Test that a stored entry is returned for the same key."""
+    cache = ConversionCache(str(tmp_path / "cache"), 1024 * 1024)
+    key = cache.key("<p>Hello</p>", "index")
+    assert cache.get(key) is None
+    cache.put(key, "Hello")
+    assert cache.get(key) == "Hello"
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_cache_key_depends_on_salt_and_base_url(tmp_path):
+    """Test that options and base URL are part of the cache key."""
+    a = ConversionCache(str(tmp_path / "cache"), 1024, salt='{"markdown": false}')
+    b = ConversionCache(str(tmp_path / "cache"), 1024, salt='{"markdown": true}')
+    assert a.key("<p>x</p>", "index") != b.key("<p>x</p>", "index")
+    assert a.key("<p>x</p>", "index") != a.key("<p>x</p>", "about/index")
+
+
+def test_cache_persists_between_instances(tmp_path):
+    """Test that a new cache instance sees entries written by an earlier one."""
+    first = ConversionCache(str(tmp_path / "cache"), 1024 * 1024)
+    key = first.key("<p>Persist</p>")
+    first.put(key, "Persist")
+
+    second = ConversionCache(str(tmp_path / "cache"), 1024 * 1024)
+    assert second.size == len("Persist")
+    assert second.get(key) == "Persist"
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    """Test that the oldest entries are evicted when the size cap is exceeded."""
+    cache = ConversionCache(str(tmp_path / "cache"), 350)
+    keys = [cache.key(f"<p>{i}</p>") for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.put(key, "x" * 100)
+        path = cache._path(key)
+        os.utime(path, (1000 + i, 1000 + i))
+
+    # Reading the first entry makes it the most recently used one
+    assert cache.get(keys[0]) is not None
+    cache.put(cache.key("<p>new</p>"), "x" * 100)
+
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[1]) is None
+    assert cache.size <= 350
+
+
+def test_cache_shares_entries_in_memory(tmp_path):
+    """Test that caches in other directories reuse conversions of this process."""
+    first = ConversionCache(str(tmp_path / "v1"), 1024 * 1024)
+    key = first.key("<p>Shared</p>")
+    first.put(key, "Shared")
+
+    second = ConversionCache(str(tmp_path / "v2"), 1024 * 1024)
+    assert second.get(key) == "Shared"
+    assert second.hits == 1
+
+    MEMO.clear()
+    assert second.get(key) is None
+
+
+def test_memo_evicts_least_recently_used():
+    """Test that the memo stays within its size by dropping old entries."""
+    memo = ConversionMemo(10)
+    memo.put("a", "xxxx")
+    memo.put("b", "xxxx")
+    assert memo.get("a") == "xxxx"
+    memo.put("c", "xxxx")
+    assert memo.get("b") is None
+    assert memo.get("a") == "xxxx"
+    assert memo.size == 8
+    memo.put("d", "x" * 11)
+    assert memo.get("d") is None
@@ -0,0 +1,69 @@
+import json
+import os
+
+from mkdocs_text_export_plugin.chunks import ChunkWriter, approx_tokens, split_chunks
+
+
+def test_split_chunks_follows_headings():
+    """Test that chunks carry the path of headings above them."""
+    text = "Intro\n\n# Guide\n\nText\n\n## Install\n\nRun it\n\n# API\n\nCalls"
+    chunks = split_chunks(text, 1000)
+    assert chunks == [
+        ([], "Intro"),
+        (["Guide"], "# Guide\n\nText"),
+        (["Guide", "Install"], "## Install\n\nRun it"),
+        (["API"], "# API\n\nCalls"),
+    ]
+
+
+def test_split_chunks_ignores_headings_in_code_fences():
+    """Test that comment lines inside code fences do not start sections."""
+    text = "# Usage\n\n```\n# not a heading\n```\n"
+    assert split_chunks(text, 1000) == [(["Usage"], text.strip())]
+
+
+def test_split_chunks_respects_max_size():
+    """Test that oversized sections are split below the limit."""
+    text = "# Long\n\n" + "\n\n".join("word " * 50 for _ in range(10))
+    for unit, measure in (("chars", len), ("tokens", approx_tokens)):
+        chunks = split_chunks(text, 100, unit)
+        assert len(chunks) > 1
+        assert all(measure(chunk) <= 100 for _, chunk in chunks)
+        assert all(path == ["Long"] for path, _ in chunks)
+
+
+def test_chunk_writer_shards(tmp_path):
+    """Test that records are sharded and stale shards are removed."""
+    (tmp_path / "chunks-00009.jsonl").write_text("stale")
+    writer = ChunkWriter(str(tmp_path), 1000, shard_size=2)
+    for i in range(5):
+        writer.add_page(f"page{i}/", f"page{i}.md", f"# Page {i}\n\nText {i}")
+    writer.close()
+
+    assert sorted(os.listdir(tmp_path)) == [
+        "chunks-00000.jsonl",
+        "chunks-00001.jsonl",
+        "chunks-00002.jsonl",
+    ]
+    lines = (tmp_path / "chunks-00002.jsonl").read_text().splitlines()
+    record = json.loads(lines[0])
+    assert record["url"] == "page4/"
+    assert record["headings"] == ["Page 4"]
+    assert record["chunk"] == 0
+    assert len(record["hash"]) == 64
+
+
+def test_chunk_writer_reads_pages_from_files(tmp_path):
+    """Test that a page chunked from its export matches one chunked from text."""
+    text = "# Title\n\nIntro\n\n## Part\n\n```\n# not a heading\n```\n"
+    export = tmp_path / "page.txt"
+    export.write_text(text)
+    writer = ChunkWriter(str(tmp_path / "chunks"), max_size=100)
+    writer.add_page("page/", "page.md", text)
+    writer.add_file("page/", "page.md", str(export))
+    writer.close()
+
+    lines = (tmp_path / "chunks" / "chunks-00000.jsonl").read_text().splitlines()
+    records = [json.loads(line) for line in lines]
+    assert len(records) == 4
+    assert records[:2] == records[2:]
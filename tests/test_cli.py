@@ -0,0 +1,123 @@
+import json
+import os
+
+import pytest
+
+from mkdocs_text_export_plugin.cli import export_path, export_site, main, read_html
+from mkdocs_text_export_plugin.pool import _renderers
+
+
+@pytest.fixture
+def site_dir(tmp_path):
+    site = tmp_path / "site"
+    (site / "about").mkdir(parents=True)
+    (site / "index.html").write_text(
+        "<html><head></head><body><h1>Home</h1></body></html>"
+    )
+    (site / "about" / "index.html").write_text(
+        "<html><head></head><body><h1>About</h1></body></html>"
+    )
+    (site / "404.html").write_text("<h1>Not found</h1>")
+    return site
+
+
+def test_export_path(tmp_path):
+    """Test that exports are named like the plugin names them."""
+    site = str(tmp_path)
+    assert export_path(site, os.path.join(site, "index.html"), "txt") == os.path.join(
+        site, "index.txt"
+    )
+    assert export_path(
+        site, os.path.join(site, "about", "index.html"), "md"
+    ) == os.path.join(site, "about", "about.md")
+    assert export_path(site, os.path.join(site, "page.html"), "txt") == os.path.join(
+        site, "page.txt"
+    )
+
+
+def test_export_path_docs_dir(tmp_path):
+    """Test that index pages are named after their source in docs_dir."""
+    site = str(tmp_path / "site")
+    docs = tmp_path / "docs"
+    (docs / "section").mkdir(parents=True)
+    (docs / "section" / "index.md").write_text("# Section")
+    (docs / "guide").mkdir()
+    (docs / "guide" / "README.md").write_text("# Guide")
+    (docs / "about.md").write_text("# About")
+
+    def path(*parts):
+        return export_path(site, os.path.join(site, *parts), "txt", str(docs))
+
+    assert path("section", "index.html") == os.path.join(site, "section", "index.txt")
+    assert path("guide", "index.html") == os.path.join(site, "guide", "README.txt")
+    assert path("about", "index.html") == os.path.join(site, "about", "about.txt")
+
+
+def test_read_html(tmp_path):
+    """Test that memory-mapped reads decode UTF-8 and handle empty files."""
+    (tmp_path / "a.html").write_bytes("<p>Zażółć</p>".encode("utf-8"))
+    (tmp_path / "empty.html").write_bytes(b"")
+    assert read_html(str(tmp_path / "a.html")) == "<p>Zażółć</p>"
+    assert read_html(str(tmp_path / "empty.html")) == ""
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_export_site(site_dir, workers):
+    """Test that every page except the excluded ones is exported."""
+    num_errors = export_site(
+        str(site_dir),
+        {"workers": workers, "combined_file": "all.txt"},
+        exclude=["404.html"],
+    )
+    assert num_errors == 0
+    assert "Home" in (site_dir / "index.txt").read_text()
+    assert "About" in (site_dir / "about" / "about.txt").read_text()
+    assert not (site_dir / "404.txt").exists()
+    combined = (site_dir / "all.txt").read_text()
+    assert combined.index("Home") < combined.index("About")
+    # The renderers and their threads do not outlive the export
+    assert not _renderers
+
+
+def test_main_inject_links(site_dir):
+    """Test the command line with link injection and a manifest."""
+    args = [str(site_dir), "--inject-links", "--workers", "0"]
+    with pytest.raises(SystemExit) as exit_info:
+        main(args + ["--manifest-file", "manifest.json"])
+    assert exit_info.value.code == 0
+
+    html = (site_dir / "about" / "index.html").read_text()
+    assert 'href="about.txt"' in html
+    manifest = json.loads((site_dir / "manifest.json").read_text())
+    assert sorted(manifest["files"]) == ["about/about.txt", "index.txt"]
+
+    # Running again does not add a second link
+    with pytest.raises(SystemExit):
+        main(args)
+    assert (site_dir / "about" / "index.html").read_text() == html
+
+
+def test_export_site_formats(site_dir):
+    """Test that every output format is exported and linked."""
+    export_site(str(site_dir), {"workers": 0, "formats": ["txt", "md"]}, inject=True)
+    assert (site_dir / "about" / "about.txt").exists()
+    assert (site_dir / "about" / "about.md").exists()
+    html = (site_dir / "about" / "index.html").read_text()
+    assert 'href="about.txt"' in html
+    assert 'href="about.md"' in html
+
+
+def test_main_invalid_option(site_dir):
+    """Test that invalid option values are rejected."""
+    with pytest.raises(SystemExit) as exit_info:
+        main([str(site_dir), "--chunk-unit", "words"])
+    assert exit_info.value.code == 2
+
+
+def test_export_site_rejects_plugin_only_options(site_dir):
+    """Test that options that only apply to mkdocs build are not ignored silently."""
+    with pytest.raises(ValueError, match="content_only"):
+        export_site(str(site_dir), {"content_only": True, "workers": 1})
+    with pytest.raises(SystemExit) as exit_info:
+        main([str(site_dir), "--convert-early"])
+    assert exit_info.value.code == 2
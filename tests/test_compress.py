@@ -0,0 +1,57 @@
+import gzip
+import os
+
+import pytest
+
+from mkdocs_text_export_plugin.compress import Compressor
+
+
+def test_compressor_writes_gzip_sidecar(tmp_path):
+    """Test that a .gz file with the same content is written next to the export."""
+    filename = str(tmp_path / "index.txt")
+    compressor = Compressor(["gz"])
+    compressor.submit(filename, b"Hello")
+    assert compressor.join() == []
+    assert gzip.decompress((tmp_path / "index.txt.gz").read_bytes()) == b"Hello"
+    assert compressor.is_current(filename)
+    compressor.shutdown()
+
+
+def test_compressor_output_is_deterministic(tmp_path):
+    """Test that identical input produces byte-identical sidecars."""
+    compressor = Compressor(["gz"])
+    compressor.submit(str(tmp_path / "a.txt"), b"Same")
+    compressor.submit(str(tmp_path / "b.txt"), b"Same")
+    compressor.join()
+    assert (tmp_path / "a.txt.gz").read_bytes() == (tmp_path / "b.txt.gz").read_bytes()
+    compressor.shutdown()
+
+
+def test_compressor_writes_brotli_sidecar(tmp_path):
+    """Test that a .br file is written when a brotli module is available."""
+    brotli = pytest.importorskip("brotli")
+    compressor = Compressor(["gz", "br"])
+    compressor.submit(str(tmp_path / "index.txt"), b"Hello")
+    compressor.join()
+    assert brotli.decompress((tmp_path / "index.txt.br").read_bytes()) == b"Hello"
+    compressor.shutdown()
+
+
+def test_unchanged_export_is_not_recompressed(tmp_path):
+    """Test that sidecars of an unchanged export are left alone."""
+    from mkdocs_text_export_plugin.renderer import Renderer
+
+    renderer = Renderer(theme="mkdocs", compress=["gz"])
+    filename = str(tmp_path / "index.txt")
+    renderer.write_txt("<p>Same</p>", "index", filename)
+    renderer.compressor.join()
+    os.utime(f"{filename}.gz", (1000, 1000))
+
+    renderer.write_txt("<p>Same</p>", "index", filename)
+    renderer.compressor.join()
+    assert os.stat(f"{filename}.gz").st_mtime == 1000
+
+    renderer.write_txt("<p>Changed</p>", "index", filename)
+    renderer.compressor.join()
+    assert os.stat(f"{filename}.gz").st_mtime != 1000
+    renderer.compressor.shutdown()
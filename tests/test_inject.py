@@ -0,0 +1,44 @@
+from mkdocs_text_export_plugin.inject import (
+    insert_after_start_tag,
+    insert_before_end_tag,
+)
+
+LINK = '<link rel="alternate"/>'
+
+
+def test_insert_before_end_of_head():
+    """Test that the fragment is spliced in at the end of <head>."""
+    html = "<html><HEAD><title>x</title></HEAD><body></body></html>"
+    assert (
+        insert_before_end_tag(html, "head", LINK)
+        == f"<html><HEAD><title>x</title>{LINK}</HEAD><body></body></html>"
+    )
+
+
+def test_insert_skips_comments_and_scripts():
+    """Test that tags inside comments and raw-text elements are ignored."""
+    html = (
+        "<html><head><!-- </head> -->"
+        "<script>document.write('</head>')</script></head><body></body></html>"
+    )
+    result = insert_before_end_tag(html, "head", LINK)
+    assert result == html.replace("</script></head>", f"</script>{LINK}</head>")
+
+
+def test_insert_is_ambiguous_without_start_tag():
+    """Test that the scan gives up when no matching start tag was seen."""
+    assert insert_before_end_tag("<html><body></body></html>", "head", LINK) is None
+    assert insert_before_end_tag("<p>x</p></head>", "head", LINK) is None
+    assert insert_before_end_tag("<head><!-- </head>", "head", LINK) is None
+
+
+def test_insert_after_start_of_footer():
+    """Test that the fragment is spliced in after the first <footer> start tag."""
+    html = (
+        '<html><head></head><body><header>h</header><footer class="a>b">'
+        "<p>f</p></footer><footer></footer></body></html>"
+    )
+    assert insert_after_start_tag(html, "footer", "<small/>") == html.replace(
+        '<footer class="a>b">', '<footer class="a>b"><small/>'
+    )
+    assert insert_after_start_tag("<footer></footer>", "footer", "<small/>") is None
@@ -0,0 +1,60 @@
+import os
+
+from mkdocs_text_export_plugin.manifest import (
+    build_manifest,
+    diff_manifests,
+    load_manifest,
+    write_manifest,
+)
+
+
+def test_build_manifest_diff(tmp_path):
+    """Test that the manifest lists added, changed and removed exports."""
+    (tmp_path / "a.txt").write_text("A")
+    (tmp_path / "b.txt").write_text("B")
+    exports = {str(tmp_path / "a.txt"): "a.md", str(tmp_path / "b.txt"): "b.md"}
+    first = build_manifest(str(tmp_path), exports, {})
+    assert first["files"]["a.txt"]["src_path"] == "a.md"
+    assert first["files"]["a.txt"]["size"] == 1
+    assert first["changes"]["added"] == ["a.txt", "b.txt"]
+
+    (tmp_path / "b.txt").write_text("B2")
+    (tmp_path / "c.txt").write_text("C")
+    exports = {str(tmp_path / "b.txt"): "b.md", str(tmp_path / "c.txt"): "c.md"}
+    second = build_manifest(str(tmp_path), exports, first)
+    assert second["changes"] == {
+        "added": ["c.txt"],
+        "changed": ["b.txt"],
+        "removed": ["a.txt"],
+    }
+    assert diff_manifests(second, second)["changed"] == []
+
+
+def test_build_manifest_reuses_unchanged_hashes(tmp_path):
+    """Test that files with an unchanged size and mtime are not hashed again."""
+    (tmp_path / "a.txt").write_text("A")
+    exports = {str(tmp_path / "a.txt"): "a.md"}
+    previous = build_manifest(str(tmp_path), exports, {})
+    previous["files"]["a.txt"]["sha256"] = "cached"
+    manifest = build_manifest(str(tmp_path), exports, previous)
+    assert manifest["files"]["a.txt"]["sha256"] == "cached"
+
+
+def test_build_manifest_skips_missing_files(tmp_path):
+    """Test that exports that were not written are left out of the manifest."""
+    (tmp_path / "a.txt").write_text("A")
+    exports = {str(tmp_path / "a.txt"): "a.md", str(tmp_path / "b.txt"): "b.md"}
+    manifest = build_manifest(str(tmp_path), exports, {})
+    assert list(manifest["files"]) == ["a.txt"]
+
+
+def test_write_and_load_manifest(tmp_path):
+    """Test that a written manifest can be loaded and bad files are ignored."""
+    filename = str(tmp_path / "out" / "manifest.json")
+    manifest = {"version": 1, "files": {}, "changes": {}}
+    write_manifest(filename, manifest)
+    assert load_manifest(filename) == manifest
+    assert load_manifest(str(tmp_path / "missing.json")) == {}
+    (tmp_path / "bad.json").write_text("{")
+    assert load_manifest(str(tmp_path / "bad.json")) == {}
+    assert os.listdir(tmp_path / "out") == ["manifest.json"]
@@ -0,0 +1,45 @@
+import json
+
+from mkdocs_text_export_plugin.metrics import BuildMetrics, collect, stage
+
+
+def test_stage_outside_collect_is_ignored():
+    """Test that stages are only timed inside a collect block."""
+    with stage("convert"):
+        pass
+
+    with collect() as timings:
+        with stage("convert"):
+            pass
+    assert set(timings.stages) == {"convert"}
+
+
+def test_nested_stages_are_exclusive():
+    """Test that nested stage time is not counted twice."""
+    with collect() as timings:
+        with stage("inject"):
+            with stage("parse"):
+                pass
+    assert set(timings.stages) == {"inject", "parse"}
+    assert all(seconds >= 0 for seconds in timings.stages.values())
+
+
+def test_build_metrics_report(tmp_path):
+    """Test totals, the slowest-pages table and the JSON file."""
+    metrics = BuildMetrics()
+    metrics.add("fast.md", {"convert": 0.1, "write": 0.01})
+    metrics.add("slow.md", {"parse": 0.5, "convert": 2.0})
+    metrics.add("slow.md", {"write": 0.2})
+
+    assert [page for page, _ in metrics.slowest(1)] == ["slow.md"]
+    assert metrics.totals()["convert"] == 2.1
+    assert metrics.totals()["inject"] == 0.0
+
+    lines = metrics.report(5).splitlines()
+    assert lines[0].split() == ["Page", "total", "parse", "convert", "write", "inject"]
+    assert lines[1].startswith("slow.md")
+
+    metrics_file = tmp_path / "metrics.json"
+    metrics.write(str(metrics_file))
+    data = json.loads(metrics_file.read_text())
+    assert data["pages"]["slow.md"]["write"] == 0.2
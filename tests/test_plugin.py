@@ -1,7 +1,14 @@
+import json
+import os
+import time
+
 import pytest
 from pathlib import Path
 from mkdocs.config import Config
 from mkdocs.config import config_options
+from mkdocs.exceptions import PluginError
+from mkdocs.utils import clean_directory
+from mkdocs_text_export_plugin.backends import Backend
 from mkdocs_text_export_plugin.plugin import MdTxtExportPlugin
 
 # Default config for testing
@@ -175,6 +182,9 @@ def test_on_nav(plugin, mock_nav_fixture, mkdocs_config):
     assert plugin.renderer is not None
     assert len(plugin.renderer.pages) == len(mock_nav_fixture.pages)
     assert plugin.renderer.page_order == [p.file.url for p in mock_nav_fixture.pages]
+    assert plugin.renderer.page_positions == {
+        p.file.url: pos for pos, p in enumerate(mock_nav_fixture.pages)
+    }
     assert result_nav == mock_nav_fixture
 
 
@@ -298,6 +308,667 @@ def test_on_post_page_disabled(plugin_config, tmp_path, mkdocs_config, monkeypat
     assert plugin.num_files == 0  # No files should be processed
 
 
+def test_on_post_page_uses_conversion_cache(
+    plugin_config, tmp_path, mkdocs_config, mock_nav_fixture, monkeypatch
+):
+    """Test that an unchanged page is served from the conversion cache."""
+    from mkdocs_text_export_plugin.renderer import Renderer
+
+    plugin_config["cache_dir"] = str(tmp_path / "cache")
+    plugin = MdTxtExportPlugin()
+    plugin.load_config(plugin_config)
+    plugin.on_config(mkdocs_config)
+    plugin.on_nav(mock_nav_fixture, mkdocs_config, files=None)
+
+    calls = []
+    convert = Renderer._convert
+
+    def counting_convert(self, content, base_url=""):
+        calls.append(content)
+        return convert(self, content, base_url)
+
+    monkeypatch.setattr(Renderer, "_convert", counting_convert)
+
+    page = mock_nav_fixture.pages[0]
+    page_content = "<h1>Cached</h1><p>This is a test.</p>"
+    plugin.on_post_page(page_content, page, mkdocs_config)
+
+    # A fresh plugin instance, as in the next `mkdocs build`, hits the cache
+    plugin = MdTxtExportPlugin()
+    plugin.load_config(plugin_config)
+    plugin.on_config(mkdocs_config)
+    plugin.on_nav(mock_nav_fixture, mkdocs_config, files=None)
+    plugin.on_post_page(page_content, page, mkdocs_config)
+
+    assert len(calls) == 1
+    assert plugin.renderer.cache.hits == 1
+    output_file_path = tmp_path / "site" / "index.txt"
+    assert "This is a test." in output_file_path.read_text()
+
+
+def test_on_post_page_with_workers(
+    plugin_config, tmp_path, mkdocs_config, mock_nav_fixture
+):
+    """Test that pages converted in a worker pool are written in on_post_build."""
+    plugin_config["workers"] = 2
+    plugin = MdTxtExportPlugin()
+    plugin.load_config(plugin_config)
+    plugin.on_config(mkdocs_config)
+    plugin.on_nav(mock_nav_fixture, mkdocs_config, files=None)
+
+    for page in mock_nav_fixture.pages:
+        plugin.on_post_page(f"<h1>{page.title}</h1>", page, mkdocs_config)
+
+    # A directory in place of the output file makes the worker fail
+    (tmp_path / "site" / "broken" / "broken.txt").mkdir(parents=True)
+    broken = MockPage(
+        "Broken",
+        "broken/index.html",
+        str(tmp_path / "site" / "broken" / "index.html"),
+        str(tmp_path / "src" / "broken.md"),
+    )
+    plugin.on_post_page("<h1>Broken</h1>", broken, mkdocs_config)
+
+    plugin.on_post_build(mkdocs_config)
+
+    assert plugin.num_files == 3
+    assert plugin.num_errors == 1
+    assert "Home" in (tmp_path / "site" / "index.txt").read_text()
+    assert "About" in (tmp_path / "site" / "about" / "about.txt").read_text()
+
+    plugin.on_shutdown()
+    assert plugin.pool is None
+
+
+def test_on_post_page_content_only(
+    plugin_config, tmp_path, mkdocs_config, mock_nav_fixture
+):
+    """Test that content_only converts the page body instead of the themed page."""
+    plugin_config["content_only"] = True
+    plugin = MdTxtExportPlugin()
+    plugin.load_config(plugin_config)
+    plugin.on_config(mkdocs_config)
+    plugin.on_nav(mock_nav_fixture, mkdocs_config, files=None)
+
+    page = mock_nav_fixture.pages[0]
+    page.content = "<h1>Home</h1><p>This is a test.</p>"
+    themed = (
+        "<html><head></head><body><nav>Navigation</nav>"
+        f"{page.content}<footer>Footer</footer></body></html>"
+    )
+    result = plugin.on_post_page(themed, page, mkdocs_config)
+
+    text = (tmp_path / "site" / "index.txt").read_text()
+    assert "This is a test." in text
+    assert "Navigation" not in text
+    assert "Footer" not in text
+    assert 'rel="alternate"' in result
+
+
+def test_on_post_build_writes_combined_file(
+    plugin_config, tmp_path, mkdocs_config, mock_nav_fixture
+):
+    """Test that the combined export follows the navigation order."""
+    plugin_config["combined_file"] = "llms-full.txt"
+    plugin = MdTxtExportPlugin()
+    plugin.load_config(plugin_config)
+    plugin.on_config(mkdocs_config)
+    mkdocs_config["site_dir"] = str(tmp_path / "site")
+    plugin.on_nav(mock_nav_fixture, mkdocs_config, files=None)
+
+    # Build the pages in reverse order to check that nav order is restored
+    for page in reversed(mock_nav_fixture.pages):
+        plugin.on_post_page(f"<p>Page {page.title}</p>", page, mkdocs_config)
+    plugin.on_post_build(mkdocs_config)
+
+    combined = (tmp_path / "site" / "llms-full.txt").read_text()
+    assert combined.index("Page Home") < combined.index("Page About")
+    assert plugin.renderer.pages[0][0] == str(tmp_path / "site" / "index.txt")
+
+
+def test_rebuild_skips_unchanged_pages(
+    plugin, tmp_path, mkdocs_config, mock_nav_fixture
+):
+    """Test that a rebuild on the same plugin instance skips unchanged pages."""
+    page = mock_nav_fixture.pages[0]
+    output_file_path = tmp_path / "site" / "index.txt"
+    plugin.on_startup(command="serve", dirty=False)
+
+    def build(content):
+        # MkDocs empties site_dir before every rebuild that is not dirty
+        clean_directory(str(tmp_path / "site"))
+        plugin.on_config(mkdocs_config)
+        plugin.on_nav(mock_nav_fixture, mkdocs_config, files=None)
+        result = plugin.on_post_page(content, page, mkdocs_config)
+        plugin.on_post_build(mkdocs_config)
+        return result
+
+    first = "<html><head></head><body><p>First</p></body></html>"
+    build(first)
+    renderer = plugin.renderer
+    os.utime(output_file_path, (1000, 1000))
+
+    result = build(first)
+    assert plugin.renderer is renderer
+    assert plugin.num_skipped == 1
+    assert os.stat(output_file_path).st_mtime == 1000
+    assert 'rel="alternate"' in result
+
+    build("<p>Second</p>")
+    assert plugin.num_skipped == 0
+    assert "Second" in output_file_path.read_text()
+
+    keep_dir = plugin.keep_dir
+    assert len(os.listdir(keep_dir)) == 1
+    plugin.on_shutdown()
+    assert not os.path.exists(keep_dir)
+
+
+def test_rebuild_keeps_compressed_sidecars(
+    plugin_config, tmp_path, mkdocs_config, mock_nav_fixture
+):
+    """Test that a rebuild restores the sidecars of unchanged pages."""
+    plugin_config["compress"] = ["gz"]
+    plugin = MdTxtExportPlugin()
+    plugin.load_config(plugin_config)
+    page = mock_nav_fixture.pages[0]
+    sidecar = tmp_path / "site" / "index.txt.gz"
+    plugin.on_startup(command="serve", dirty=False)
+
+    def build():
+        clean_directory(str(tmp_path / "site"))
+        plugin.on_config(mkdocs_config)
+        plugin.on_nav(mock_nav_fixture, mkdocs_config, files=None)
+        plugin.on_post_page("<p>Same</p>", page, mkdocs_config)
+        plugin.on_post_build(mkdocs_config)
+
+    build()
+    assert sidecar.exists()
+    inode = os.stat(sidecar).st_ino
+    build()
+    assert plugin.num_skipped == 1
+    assert os.stat(sidecar).st_ino == inode
+    assert len(os.listdir(plugin.keep_dir)) == 2
+    plugin.on_shutdown()
+
+
+def test_fingerprint_of_large_pages():
+    """Test that pages hashed in slices get the same fingerprint as a whole."""
+    import hashlib
+
+    content = "<p>Größe</p>" * 200000
+    expected = hashlib.sha256(f"index\0{content}".encode("utf-8")).hexdigest()
+    assert MdTxtExportPlugin._fingerprint(content, "index") == expected
+
+
+def test_write_txt_keeps_identical_files(tmp_path):
+    """Test that an identical export is not rewritten."""
+    from mkdocs_text_export_plugin.renderer import Renderer
+
+    renderer = Renderer(theme="mkdocs")
+    output_file_path = tmp_path / "index.txt"
+    renderer.write_txt("<p>Same</p>", "index", str(output_file_path))
+    os.utime(output_file_path, (1000, 1000))
+    renderer.write_txt("<p>Same</p>", "index", str(output_file_path))
+    assert os.stat(output_file_path).st_mtime == 1000
+
+
+def test_on_post_build_writes_metrics_file(
+    plugin_config, tmp_path, mkdocs_config, mock_nav_fixture
+):
+    """Test that per-page stage timings are written to the metrics file."""
+    import json
+
+    plugin_config["metrics_file"] = str(tmp_path / "metrics.json")
+    plugin = MdTxtExportPlugin()
+    plugin.load_config(plugin_config)
+    plugin.on_config(mkdocs_config)
+    plugin.on_nav(mock_nav_fixture, mkdocs_config, files=None)
+
+    page = mock_nav_fixture.pages[0]
+    plugin.on_post_page("<html><head></head><body>x</body></html>", page, mkdocs_config)
+    plugin.on_post_build(mkdocs_config)
+
+    metrics = json.loads((tmp_path / "metrics.json").read_text())
+    timings = metrics["pages"][page.file.src_path]
+    assert {"convert", "write", "inject"} <= set(timings)
+
+
+def test_on_post_page_write_behind(
+    plugin_config, tmp_path, mkdocs_config, mock_nav_fixture
+):
+    """Test that queued exports are written by the end of the build."""
+    plugin_config["write_behind"] = True
+    plugin = MdTxtExportPlugin()
+    plugin.load_config(plugin_config)
+    plugin.on_config(mkdocs_config)
+    plugin.on_nav(mock_nav_fixture, mkdocs_config, files=None)
+
+    for page in mock_nav_fixture.pages:
+        plugin.on_post_page(f"<h1>{page.title}</h1>", page, mkdocs_config)
+    plugin.on_post_build(mkdocs_config)
+
+    assert plugin.num_errors == 0
+    assert "Home" in (tmp_path / "site" / "index.txt").read_text()
+    assert "About" in (tmp_path / "site" / "about" / "about.txt").read_text()
+
+
+def test_failed_write_behind_is_left_out_of_manifest(
+    plugin_config, tmp_path, mkdocs_config, mock_nav_fixture
+):
+    """Test that an export that failed to write is not in the manifest."""
+    plugin_config["write_behind"] = True
+    plugin_config["manifest_file"] = "manifest.json"
+    plugin = MdTxtExportPlugin()
+    plugin.load_config(plugin_config)
+    plugin.on_config(mkdocs_config)
+    mkdocs_config["site_dir"] = str(tmp_path / "site")
+    plugin.on_nav(mock_nav_fixture, mkdocs_config, files=None)
+
+    write_file = plugin.renderer.writer.write_file
+
+    def failing_write(filename, data):
+        if filename.endswith("about.txt"):
+            raise OSError("Disk full")
+        return write_file(filename, data)
+
+    plugin.renderer.writer.write_file = failing_write
+    for page in mock_nav_fixture.pages:
+        plugin.on_post_page(f"<h1>{page.title}</h1>", page, mkdocs_config)
+    plugin.on_post_build(mkdocs_config)
+
+    assert plugin.num_errors == 1
+    manifest = json.loads((tmp_path / "site" / "manifest.json").read_text())
+    assert list(manifest["files"]) == ["index.txt"]
+
+
+def test_on_post_build_chunks(plugin_config, tmp_path, mkdocs_config, mock_nav_fixture):
+    """Test that converted pages are written as JSONL chunks."""
+    plugin_config["chunks_dir"] = "chunks"
+    plugin = MdTxtExportPlugin()
+    plugin.load_config(plugin_config)
+    plugin.on_config(mkdocs_config)
+    mkdocs_config["site_dir"] = str(tmp_path / "site")
+    plugin.on_nav(mock_nav_fixture, mkdocs_config, files=None)
+
+    for page in mock_nav_fixture.pages:
+        plugin.on_post_page(f"<h1>{page.title}</h1>", page, mkdocs_config)
+    plugin.on_post_build(mkdocs_config)
+
+    assert plugin.num_errors == 0
+    lines = (tmp_path / "site" / "chunks" / "chunks-00000.jsonl").read_text()
+    records = [json.loads(line) for line in lines.splitlines()]
+    assert [r["src_path"] for r in records] == [
+        p.file.src_path for p in mock_nav_fixture.pages
+    ]
+    assert "Home" in records[0]["content"]
+
+
+def test_on_post_build_manifest(
+    plugin_config, tmp_path, mkdocs_config, mock_nav_fixture
+):
+    """Test that the manifest records the exports of each build and their changes."""
+    plugin_config["manifest_file"] = "manifest.json"
+    mkdocs_config["site_dir"] = str(tmp_path / "site")
+    manifest_file = tmp_path / "site" / "manifest.json"
+
+    for title in ("Home", "Start"):
+        plugin = MdTxtExportPlugin()
+        plugin.load_config(plugin_config)
+        plugin.on_config(mkdocs_config)
+        plugin.on_pre_build(mkdocs_config)
+        plugin.on_nav(mock_nav_fixture, mkdocs_config, files=None)
+        for page in mock_nav_fixture.pages:
+            page_title = title if page.file.url == "index.html" else page.title
+            plugin.on_post_page(f"<h1>{page_title}</h1>", page, mkdocs_config)
+        plugin.on_post_build(mkdocs_config)
+        assert plugin.num_errors == 0
+
+    manifest = json.loads(manifest_file.read_text())
+    home = mock_nav_fixture.pages[0]
+    assert manifest["files"]["index.txt"]["src_path"] == home.file.src_path
+    assert manifest["changes"] == {
+        "added": [],
+        "changed": ["index.txt"],
+        "removed": [],
+    }
+
+
+def test_on_nav_invalid_backend(plugin_config, mkdocs_config, mock_nav_fixture):
+    """Test that an unknown backend fails the build with a plugin error."""
+    plugin_config["backend"] = "nonexistent"
+    plugin = MdTxtExportPlugin()
+    plugin.load_config(plugin_config)
+    plugin.on_config(mkdocs_config)
+    with pytest.raises(PluginError):
+        plugin.on_nav(mock_nav_fixture, mkdocs_config, files=None)
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_on_post_page_formats(
+    plugin_config, tmp_path, mkdocs_config, mock_nav_fixture, workers
+):
+    """Test that several output formats are exported and linked in one build."""
+    plugin_config["formats"] = ["txt", {"markdown": True, "kill_tags": ["footer"]}]
+    plugin_config["combined_file"] = "llms-full.txt"
+    plugin_config["workers"] = workers
+    plugin = MdTxtExportPlugin()
+    plugin.load_config(plugin_config)
+    plugin.on_config(mkdocs_config)
+    mkdocs_config["site_dir"] = str(tmp_path / "site")
+    plugin.on_nav(mock_nav_fixture, mkdocs_config, files=None)
+
+    page = mock_nav_fixture.pages[0]
+    page_content = (
+        "<html><head></head><body><h1>Home</h1><footer>Footer</footer></body></html>"
+    )
+    result = plugin.on_post_page(page_content, page, mkdocs_config)
+    plugin.on_post_build(mkdocs_config)
+
+    assert plugin.num_errors == 0
+    assert plugin.file_ext == "txt"
+    assert 'href="index.txt"' in result
+    assert 'href="index.md"' in result
+    assert "Footer" in (tmp_path / "site" / "index.txt").read_text()
+    assert "Footer" not in (tmp_path / "site" / "index.md").read_text()
+    assert "Home" in (tmp_path / "site" / "llms-full.txt").read_text()
+    assert "Home" in (tmp_path / "site" / "llms-full.md").read_text()
+
+
+@pytest.mark.parametrize(
+    "formats",
+    [
+        ["txt", "txt"],
+        ["pdf"],
+        [{"markdown": True, "theme": "x"}],
+        [{"kill_tags": "footer"}],
+        [{"markdown": "yes"}],
+        [{"open_quote": 1}],
+    ],
+)
+def test_on_config_invalid_formats(plugin_config, mkdocs_config, formats):
+    """Test that unknown, clashing or mistyped output formats are rejected."""
+    plugin_config["formats"] = formats
+    plugin = MdTxtExportPlugin()
+    plugin.load_config(plugin_config)
+    with pytest.raises(PluginError):
+        plugin.on_config(mkdocs_config)
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_on_post_build_boilerplate(
+    plugin_config, tmp_path, mkdocs_config, mock_nav_fixture, workers
+):
+    """Test that blocks repeated across pages are removed from the exports."""
+    plugin_config["boilerplate_threshold"] = 0.5
+    plugin_config["workers"] = workers
+    plugin = MdTxtExportPlugin()
+    plugin.load_config(plugin_config)
+    plugin.on_config(mkdocs_config)
+    plugin.on_nav(mock_nav_fixture, mkdocs_config, files=None)
+
+    banner = "<aside>Edit this page on the documentation repository.</aside>"
+    for page in mock_nav_fixture.pages:
+        html = f"<html><head></head><body>{banner}<h1>{page.title}</h1></body></html>"
+        result = plugin.on_post_page(html, page, mkdocs_config)
+        assert 'rel="alternate"' in result
+        assert banner in result
+    spool_dir = plugin.spool_dir
+    plugin.on_post_build(mkdocs_config)
+
+    assert plugin.num_errors == 0
+    home = (tmp_path / "site" / "index.txt").read_text()
+    assert "Home" in home
+    assert "Edit this page" not in home
+    assert "About" in (tmp_path / "site" / "about" / "about.txt").read_text()
+    assert not os.path.exists(spool_dir)
+
+
+class SlowBackend(Backend):
+    name = "slow"
+
+    def convert(self, content: str, base_url: str = "") -> str:
+        if "slow" in content:
+            time.sleep(5)
+        return "converted\n"
+
+
+@pytest.mark.parametrize(
+    "on_timeout,workers", [("fallback", 0), ("fallback", 2), ("skip", 2)]
+)
+def test_on_post_page_timeout(
+    plugin_config, tmp_path, mkdocs_config, mock_nav_fixture, on_timeout, workers
+):
+    """Test that pages over the time budget fall back or count as errors."""
+    plugin_config["backend"] = f"{__name__}:SlowBackend"
+    plugin_config["page_timeout"] = 0.2
+    plugin_config["on_timeout"] = on_timeout
+    plugin_config["workers"] = workers
+    plugin = MdTxtExportPlugin()
+    plugin.load_config(plugin_config)
+    plugin.on_config(mkdocs_config)
+    plugin.on_nav(mock_nav_fixture, mkdocs_config, files=None)
+
+    home, about = mock_nav_fixture.pages
+    plugin.on_post_page("<h1>Home</h1>", home, mkdocs_config)
+    plugin.on_post_page("<h1>About is slow</h1>", about, mkdocs_config)
+    plugin.on_post_build(mkdocs_config)
+
+    assert (tmp_path / "site" / "index.txt").read_text() == "converted\n"
+    about_txt = tmp_path / "site" / "about" / "about.txt"
+    if on_timeout == "fallback":
+        assert plugin.num_errors == 0
+        assert plugin.fallback_pages == [about.file.src_path]
+        assert about_txt.read_text() == "About is slow\n"
+    else:
+        assert plugin.num_errors == 1
+        assert not about_txt.exists()
+
+
+def test_worker_pool_is_kept_across_rebuilds(
+    plugin_config, tmp_path, mkdocs_config, mock_nav_fixture
+):
+    """Test that the worker pool and its processes are reused between builds."""
+    plugin_config["workers"] = 2
+    plugin = MdTxtExportPlugin()
+    plugin.load_config(plugin_config)
+    plugin.on_startup(command="serve", dirty=False)
+
+    pools = []
+    for title in ("First", "Second"):
+        plugin.on_config(mkdocs_config)
+        plugin.on_nav(mock_nav_fixture, mkdocs_config, files=None)
+        page = mock_nav_fixture.pages[0]
+        plugin.on_post_page(f"<h1>{title}</h1>", page, mkdocs_config)
+        plugin.on_post_build(mkdocs_config)
+        pools.append((plugin.pool, set(plugin.pool.executor._processes)))
+        assert title in (tmp_path / "site" / "index.txt").read_text()
+
+    assert pools[0] == pools[1]
+
+    plugin.on_shutdown()
+    assert plugin.pool is None
+    assert plugin.renderer is None
+
+
+def test_versions_share_conversions_and_exports(
+    plugin_config, tmp_path, mkdocs_config, monkeypatch
+):
+    """Test that later versions of a site reuse conversions and export files."""
+    from mkdocs_text_export_plugin.renderer import Renderer
+
+    plugin_config["backend"] = "lxml"
+    plugin_config["cache_dir"] = str(tmp_path / "cache")
+    plugin_config["store_dir"] = str(tmp_path / "store")
+
+    calls = []
+    convert = Renderer._convert
+
+    def counting_convert(self, content, base_url=""):
+        calls.append(base_url)
+        return convert(self, content, base_url)
+
+    monkeypatch.setattr(Renderer, "_convert", counting_convert)
+
+    for version in ("v1", "v2"):
+        site_dir = tmp_path / "site" / version
+        page = MockPage(
+            "Home",
+            "index.html",
+            str(site_dir / "index.html"),
+            str(tmp_path / "src" / "index.md"),
+        )
+        plugin = MdTxtExportPlugin()
+        plugin.load_config(plugin_config)
+        plugin.on_config(mkdocs_config)
+        plugin.on_nav(MockNav([page]), mkdocs_config, files=None)
+        plugin.on_post_page("<h1>Home</h1><p>Same text.</p>", page, mkdocs_config)
+        plugin.on_post_build(mkdocs_config)
+        plugin.on_shutdown()
+
+    assert len(calls) == 1
+    v1 = tmp_path / "site" / "v1" / "index.txt"
+    v2 = tmp_path / "site" / "v2" / "index.txt"
+    assert v2.read_text() == "# Home\n\nSame text.\n"
+    assert os.path.samefile(v1, v2)
+
+
+def test_sharded_build_merges_in_nav_order(plugin_config, tmp_path, mkdocs_config):
+    """Test that shards export disjoint pages and merge in navigation order."""
+    from mkdocs_text_export_plugin.shards import merge_shards
+
+    plugin_config["shard_count"] = 2
+    plugin_config["manifest_file"] = "manifest.json"
+    plugin_config["combined_file"] = "all.txt"
+    titles = ["Home", "About", "Guide", "Reference"]
+    shard_dirs = []
+    num_files = 0
+    for index in range(2):
+        site_dir = tmp_path / f"shard-{index}"
+        mkdocs_config["site_dir"] = str(site_dir)
+        pages = [
+            MockPage(
+                title,
+                f"{title.lower()}.html",
+                str(site_dir / f"{title.lower()}.html"),
+                str(tmp_path / "src" / f"{title.lower()}.md"),
+            )
+            for title in titles
+        ]
+        plugin_config["shard_index"] = index
+        plugin = MdTxtExportPlugin()
+        plugin.load_config(plugin_config)
+        plugin.on_config(mkdocs_config)
+        plugin.on_pre_build(mkdocs_config)
+        plugin.on_nav(MockNav(pages), mkdocs_config, files=None)
+        for page in pages:
+            plugin.on_post_page(f"<h1>{page.title}</h1>", page, mkdocs_config)
+        plugin.on_post_build(mkdocs_config)
+        assert (site_dir / f"manifest.shard-{index}-of-2.json").exists()
+        # Only the pages of this shard count as exported
+        assert plugin.num_files == len(list(site_dir.glob("*.txt")))
+        num_files += plugin.num_files
+        shard_dirs.append(str(site_dir))
+
+    exported = sorted(path.name for d in shard_dirs for path in Path(d).glob("*.txt"))
+    assert exported == sorted(f"{title.lower()}.txt" for title in titles)
+    assert num_files == len(titles)
+
+    merge_shards(str(tmp_path / "site"), "manifest.json", shard_dirs)
+    combined = (tmp_path / "site" / "all.txt").read_text()
+    assert [combined.index(title) for title in titles] == sorted(
+        combined.index(title) for title in titles
+    )
+
+
+def test_on_config_invalid_shard(plugin_config, mkdocs_config):
+    """Test that a shard index outside of the shard count is rejected."""
+    plugin_config["shard_count"] = 2
+    plugin_config["shard_index"] = 2
+    plugin = MdTxtExportPlugin()
+    plugin.load_config(plugin_config)
+    with pytest.raises(PluginError):
+        plugin.on_config(mkdocs_config)
+
+
+def test_on_post_page_excluded_pages(
+    plugin_config, tmp_path, mkdocs_config, mock_nav_fixture
+):
+    """Test that excluded pages are returned unchanged and not exported."""
+    plugin_config["exclude_pages"] = ["*/about.md"]
+    plugin = MdTxtExportPlugin()
+    plugin.load_config(plugin_config)
+    plugin.on_config(mkdocs_config)
+    plugin.on_nav(mock_nav_fixture, mkdocs_config, files=None)
+
+    home, about = mock_nav_fixture.pages
+    plugin.on_post_page("<h1>Home</h1>", home, mkdocs_config)
+    assert plugin.on_post_page("<h1>About</h1>", about, mkdocs_config) == (
+        "<h1>About</h1>"
+    )
+    plugin.on_post_build(mkdocs_config)
+
+    assert (tmp_path / "site" / "index.txt").exists()
+    assert not (tmp_path / "site" / "about" / "about.txt").exists()
+    assert plugin.num_files == 1
+    assert plugin.num_excluded == 1
+
+
+def test_convert_early(plugin_config, tmp_path, mkdocs_config, mock_nav_fixture):
+    """Test that pages are submitted from on_page_content and skipped later."""
+    plugin_config["convert_early"] = True
+    plugin_config["workers"] = 2
+    plugin = MdTxtExportPlugin()
+    plugin.load_config(plugin_config)
+    plugin.on_startup(command="serve", dirty=False)
+
+    for build in range(2):
+        clean_directory(str(tmp_path / "site"))
+        plugin.on_config(mkdocs_config)
+        plugin.on_nav(mock_nav_fixture, mkdocs_config, files=None)
+        page = mock_nav_fixture.pages[0]
+        page.content = "<h1>Home</h1><p>This is a test.</p>"
+        assert plugin.on_page_content(page.content, page, mkdocs_config, None) == (
+            page.content
+        )
+        assert len(plugin.pool.pending) == (1 if build == 0 else 0)
+        themed = f"<html><head></head><body><nav>Nav</nav>{page.content}</body></html>"
+        result = plugin.on_post_page(themed, page, mkdocs_config)
+        assert 'rel="alternate"' in result
+        plugin.on_post_build(mkdocs_config)
+
+        text = (tmp_path / "site" / "index.txt").read_text()
+        assert "This is a test." in text
+        assert "Nav" not in text
+        assert plugin.num_errors == 0
+        assert plugin.num_skipped == build
+
+    plugin.on_shutdown()
+
+
+def test_convert_early_needs_workers(
+    plugin_config, tmp_path, mkdocs_config, mock_nav_fixture, caplog
+):
+    """Test that convert_early without workers falls back to on_post_page."""
+    plugin_config["convert_early"] = True
+    plugin = MdTxtExportPlugin()
+    plugin.load_config(plugin_config)
+    plugin.on_config(mkdocs_config)
+    plugin.on_nav(mock_nav_fixture, mkdocs_config, files=None)
+    assert "convert_early needs workers" in caplog.text
+    assert not plugin.convert_early
+    assert plugin.pool is None
+
+    page = mock_nav_fixture.pages[0]
+    assert plugin.on_page_content("<h1>Home</h1>", page, mkdocs_config, None) == (
+        "<h1>Home</h1>"
+    )
+    plugin.on_post_page("<h1>Home</h1>", page, mkdocs_config)
+    plugin.on_post_build(mkdocs_config)
+    assert "Home" in (tmp_path / "site" / "index.txt").read_text()
+    plugin.on_shutdown()
+
+
 # TODO: Add tests for different renderer options (plain_tables, etc.)
 # TODO: Add tests for theme handlers.
 # TODO: Test error handling in on_post_page (e.g., if renderer.write_txt fails)
@@ -0,0 +1,91 @@
+import pytest
+
+from mkdocs_text_export_plugin.backends import Backend
+from mkdocs_text_export_plugin.document import HtmlDocument
+from mkdocs_text_export_plugin.metrics import collect
+from mkdocs_text_export_plugin.renderer import Renderer
+
+PAGE = (
+    "<html><head><title>Home</title></head>"
+    "<body><h1>Home</h1><p>This is a test.</p><footer>Footer</footer></body></html>"
+)
+
+
+def test_html_document_is_parsed_lazily():
+    """Test that the original markup is kept until the tree is modified."""
+    doc = HtmlDocument(PAGE)
+    assert not doc.parsed
+    assert doc.html == PAGE
+
+    doc.soup.body.append(doc.soup.new_tag("hr"))
+    assert doc.html == PAGE
+    doc.mark_modified()
+    assert "<hr/>" in doc.html
+
+
+@pytest.mark.parametrize("theme", ["mkdocs", "cinder", "generic"])
+def test_add_link_matches_modify_html(theme):
+    """Test that spliced and tree-based link injection match the string API."""
+    renderer = Renderer(theme=theme)
+    expected = renderer.theme.modify_html(PAGE, "index.txt")
+    assert renderer.add_link(HtmlDocument(PAGE), "index.txt") == expected
+
+    doc = HtmlDocument(PAGE)
+    renderer.theme.modify_soup(doc.soup, "index.txt")
+    doc.mark_modified()
+    assert doc.html == expected
+
+
+def test_link_is_added_without_parsing_the_document(tmp_path):
+    """Test that the link is spliced in without parsing the shared document."""
+    renderer = Renderer(theme="mkdocs")
+    output_file = tmp_path / "index.txt"
+    doc = HtmlDocument(PAGE)
+    with collect() as timings:
+        text = renderer.write_txt(doc, "index", str(output_file))
+        html = renderer.add_link(doc, "index.txt")
+
+    # Only the backend parses the page, not the HtmlDocument
+    assert "parse" not in timings.stages
+    assert 'rel="alternate"' in html
+    assert "This is a test." in output_file.read_text()
+    assert "This is a test." in text
+
+
+def test_add_link_falls_back_to_soup():
+    """Test that link injection uses the parsed tree when the scan is ambiguous."""
+    renderer = Renderer(theme="mkdocs")
+    page = "<html><body><p>No head here</p></body></html>"
+    doc = HtmlDocument(page)
+    assert renderer.add_link(doc, "index.txt") == page
+    assert doc.parsed
+
+
+class RecordingBackend(Backend):
+    name = "recording"
+
+    def convert(self, content: str, base_url: str = "") -> str:
+        return f"convert {content}"
+
+    def convert_pruned(self, content: str, base_url: str = "") -> str:
+        return f"pruned {content}"
+
+
+def test_prune_removes_kill_tags_from_the_tree():
+    """Test that a pruned document is converted without kill_tags."""
+    renderer = Renderer(
+        theme="mkdocs", backend=f"{__name__}:RecordingBackend", kill_tags=["footer"]
+    )
+    doc = HtmlDocument(PAGE)
+    assert renderer.render_doc(doc).startswith("convert ")
+
+    renderer.prune(doc)
+    text = renderer.render_doc(doc)
+    assert text.startswith("pruned ")
+    assert "Footer" not in text
+
+    # A format with other kill_tags still removes its own
+    other = Renderer(
+        theme="mkdocs", backend=f"{__name__}:RecordingBackend", kill_tags=["h1"]
+    )
+    assert other.render_doc(doc).startswith("convert ")
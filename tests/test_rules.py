@@ -0,0 +1,46 @@
+import pytest
+
+from mkdocs_text_export_plugin.rules import KillRules, PageFilter
+
+
+def test_kill_rules_remove_matches_in_one_pass():
+    """Test that all selectors are applied together, nested matches included."""
+    from bs4 import BeautifulSoup
+
+    rules = KillRules(["nav", " .admonition ", "footer p"])
+    soup = BeautifulSoup(
+        '<nav><div class="admonition">x</div></nav><p>Keep</p>'
+        '<div class="admonition">Note</div>'
+        "<footer><p>Gone</p><span>Kept</span></footer>",
+        "html.parser",
+    )
+    assert rules.apply(soup) == 3
+    assert str(soup) == "<p>Keep</p><footer><span>Kept</span></footer>"
+
+
+def test_kill_rules_without_selectors():
+    """Test that empty rules are falsy and remove nothing."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup("<p>Keep<br/></p>", "html.parser")
+    assert not KillRules([" "])
+    assert KillRules([]).apply(soup) == 0
+    assert str(soup) == "<p>Keep<br/></p>"
+
+
+def test_kill_rules_invalid_selector():
+    """Test that invalid selectors are reported when the rules are compiled."""
+    with pytest.raises(ValueError, match="kill_tags"):
+        KillRules(["p["])
+
+
+def test_page_filter():
+    """Test that pages are selected by include and exclude globs."""
+    page_filter = PageFilter(["docs/*", "index.md"], ["*/changelog.md", "api/*"])
+    assert page_filter.matches("index.md")
+    assert page_filter.matches("docs/guide/intro.md")
+    assert not page_filter.matches("docs/changelog.md")
+    assert not page_filter.matches("about.md")
+    assert PageFilter(exclude=["api/*"]).matches("about.md")
+    assert not PageFilter(exclude=["api/*"]).matches("api\\index.md")
+    assert not PageFilter()
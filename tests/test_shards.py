@@ -0,0 +1,71 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from mkdocs_text_export_plugin.cli import export_site, main
+from mkdocs_text_export_plugin.shards import merge_shards, shard_name, shard_of
+
+
+@pytest.fixture
+def site_dir(tmp_path):
+    site = tmp_path / "site"
+    site.mkdir()
+    for i in range(8):
+        (site / f"page{i}.html").write_text(f"<h1>Page {i}</h1><p>Text {i}.</p>")
+    return site
+
+
+def test_shard_of_is_stable():
+    """Test that shards depend on the path only and cover every shard."""
+    assert shard_of("a/b.md", 4) == shard_of("a/b.md", 4)
+    assert {shard_of(f"page{i}.md", 3) for i in range(30)} == {0, 1, 2}
+    assert shard_name("m.json", 1, 4) == "m.shard-1-of-4.json"
+
+
+def test_merge_shards(site_dir, tmp_path):
+    """Test that the outputs of every shard are merged into one tree."""
+    shard_dirs = []
+    for index in range(3):
+        shard_dir = tmp_path / f"shard-{index}"
+        shutil.copytree(site_dir, shard_dir)
+        num_errors = export_site(
+            str(shard_dir),
+            {
+                "workers": 0,
+                "backend": "lxml",
+                "shard_index": index,
+                "shard_count": 3,
+                "manifest_file": "manifest.json",
+                "combined_file": "all.txt",
+            },
+        )
+        assert num_errors == 0
+        assert not (shard_dir / "all.txt").exists()
+        shard_dirs.append(str(shard_dir))
+
+    # Every page is exported by exactly one shard
+    exported = sorted(
+        path.name for shard in shard_dirs for path in Path(shard).glob("*.txt")
+    )
+    assert exported == [f"page{i}.txt" for i in range(8)]
+
+    with pytest.raises(ValueError, match="Missing"):
+        merge_shards(str(site_dir), "manifest.json", shard_dirs[:2])
+
+    with pytest.raises(SystemExit) as exit_info:
+        main(
+            [str(site_dir), "--manifest-file", "manifest.json"]
+            + [arg for shard in shard_dirs for arg in ("--merge", shard)]
+        )
+    assert exit_info.value.code == 0
+
+    for i in range(8):
+        assert (site_dir / f"page{i}.txt").read_text() == f"# Page {i}\n\nText {i}.\n"
+    combined = (site_dir / "all.txt").read_text()
+    assert [combined.index(f"Page {i}") for i in range(8)] == sorted(
+        combined.index(f"Page {i}") for i in range(8)
+    )
+    manifest = (site_dir / "manifest.json").read_text()
+    assert '"page7.txt"' in manifest
+    assert '"shard"' not in manifest
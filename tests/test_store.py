@@ -0,0 +1,76 @@
+import os
+
+from mkdocs_text_export_plugin.store import BlobStore
+
+
+def test_store_links_identical_exports(tmp_path):
+    """Test that identical exports share one blob in the store."""
+    store = BlobStore(str(tmp_path / "store"), 1024 * 1024)
+    (tmp_path / "v1").mkdir()
+    (tmp_path / "v2").mkdir()
+    first = str(tmp_path / "v1" / "index.txt")
+    second = str(tmp_path / "v2" / "index.txt")
+
+    assert store.write(first, b"Hello")
+    assert store.write(second, b"Hello")
+    assert os.path.samefile(first, second)
+    assert os.stat(first).st_nlink == 3
+    assert store.stored == 1
+    assert store.linked == 2
+
+    # Writing the same bytes again leaves the file alone
+    assert not store.write(first, b"Hello")
+
+    # Changed content gets a new blob and leaves the other copy untouched
+    assert store.write(first, b"Changed")
+    with open(second, "rb") as f:
+        assert f.read() == b"Hello"
+    assert store.stored == 2
+
+
+def test_store_evicts_unused_blobs(tmp_path):
+    """Test that only blobs without exports linked to them are evicted."""
+    store = BlobStore(str(tmp_path / "store"), 0)
+    used = str(tmp_path / "used.txt")
+    unused = str(tmp_path / "unused.txt")
+    store.write(used, b"used")
+    store.write(unused, b"unused")
+    os.unlink(unused)
+
+    assert store.evict() == 1
+    assert len(list((tmp_path / "store").glob("??/*"))) == 1
+    with open(used, "rb") as f:
+        assert f.read() == b"used"
+
+
+def test_store_falls_back_to_copies(tmp_path):
+    """Test that exports are copied when hard links are not possible."""
+    store = BlobStore(str(tmp_path / "store"), 1024 * 1024)
+    store.can_link = False
+    filename = str(tmp_path / "index.txt")
+    assert store.write(filename, b"Hello")
+    assert not store.write(filename, b"Hello")
+    assert os.stat(filename).st_nlink == 1
+
+
+def test_store_rewrites_evicted_blob(tmp_path, monkeypatch):
+    """Test that a blob evicted between the check and the link is rewritten."""
+    store = BlobStore(str(tmp_path / "store"), 1024 * 1024)
+    filename = str(tmp_path / "index.txt")
+    link = os.link
+    calls = []
+
+    def evicting_link(src, dst):
+        # Another build evicts the blob right before the first link
+        if not calls:
+            os.unlink(src)
+        calls.append(src)
+        link(src, dst)
+
+    monkeypatch.setattr(os, "link", evicting_link)
+    assert store.write(filename, b"Hello")
+    assert len(calls) == 2
+    assert store.stored == 2
+    assert os.stat(filename).st_nlink == 2
+    with open(filename, "rb") as f:
+        assert f.read() == b"Hello"
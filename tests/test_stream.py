@@ -0,0 +1,90 @@
+import os
+
+from mkdocs_text_export_plugin import stream
+from mkdocs_text_export_plugin.renderer import Renderer
+from mkdocs_text_export_plugin.stream import skip_tags, stream_txt
+
+
+def test_stream_txt_across_windows(tmp_path, monkeypatch):
+    """Test that tags and entities split between windows are converted."""
+    monkeypatch.setattr(stream, "WINDOW", 5)
+    html = (
+        "<h1>Title</h1><nav><ul><li>Menu</li></ul></nav>"
+        "<p>Hello &amp; <q>quoted</q> <a href='a.html'>link</a> <del>old</del></p>"
+    )
+    filename = tmp_path / "page.txt"
+    size = stream_txt(html, str(filename), skip=skip_tags(["nav"], True))
+    text = filename.read_text()
+    assert size == filename.stat().st_size
+    assert text.startswith("# Title\n\nHello & “quoted” link")
+    assert "Menu" not in text
+    assert "old" not in text
+
+    stream_txt(html, str(filename), markdown=True)
+    text = filename.read_text()
+    assert "[link](a.html)" in text
+    assert "* Menu" in text
+
+
+def test_skip_tags_ignores_selectors(caplog):
+    """Test that only tag names are skipped on a stream."""
+    assert skip_tags(["Nav", "div.admonition"]) == {"nav"}
+    assert "div.admonition" in caplog.text
+
+
+def test_renderer_streams_large_pages(tmp_path):
+    """Test that pages above the threshold bypass the backend and the cache."""
+    renderer = Renderer(
+        "mkdocs", backend="lxml", stream_threshold=1, cache_dir=str(tmp_path / "cache")
+    )
+    html = "<h1>Big</h1>" + "<p>Paragraph of a large page.</p>" * 40000
+    filename = tmp_path / "big.txt"
+
+    # The text of a streamed page is not read back into memory
+    assert renderer.write_txt(html, "", str(filename)) is None
+    text = filename.read_text()
+    assert text.startswith("# Big\n\nParagraph of a large page.\n\n")
+    assert text.count("Paragraph") == 40000
+    assert renderer.cache.misses == 0
+
+    small = tmp_path / "small.txt"
+    assert renderer.write_txt("<h1>Small</h1>", "", str(small)) == "# Small\n"
+    assert renderer.cache.misses == 1
+    renderer.close()
+
+
+def test_streamed_pages_use_the_store(tmp_path):
+    """Test that streamed exports are linked to the store and kept if identical."""
+    renderer = Renderer(
+        "mkdocs", backend="lxml", stream_threshold=1, store_dir=str(tmp_path / "store")
+    )
+    html = "<h1>Big</h1>" + "<p>Paragraph of a large page.</p>" * 40000
+    filename = tmp_path / "big.txt"
+
+    renderer.write_txt(html, "", str(filename))
+    assert renderer.store.stored == 1
+    assert filename.stat().st_nlink == 2
+    assert filename.read_text().count("Paragraph") == 40000
+
+    os.utime(filename, (1000, 1000))
+    renderer.write_txt(html, "", str(filename))
+    assert filename.stat().st_mtime == 1000
+    # No temporary files are left behind
+    assert sorted(os.listdir(tmp_path)) == ["big.txt", "store"]
+    renderer.close()
+
+
+def test_stream_txt_ends_skipped_elements_like_html(tmp_path):
+    """Test that unclosed elements inside a skipped element do not hide the rest."""
+    html = (
+        "<nav><ul><li>Home<li>About</ul></nav><p>After nav" "<p>Kept <del>old<p>New</p>"
+    )
+    filename = tmp_path / "page.txt"
+    stream_txt(html, str(filename), skip=skip_tags(["nav"], True))
+    text = filename.read_text()
+    assert "Home" not in text
+    assert "About" not in text
+    assert "After nav" in text
+    assert "Kept" in text
+    assert "old" not in text
+    assert "New" in text
@@ -3,6 +3,9 @@
 Tests for version management utilities.
 """
 
+import subprocess
+import sys
+
 import pytest
 from unittest.mock import patch, MagicMock
 from version import get_version, parse_git_describe, is_release_version
@@ -89,6 +92,14 @@ class TestGetVersion:
         result = get_version()
         assert result == "0.0.0.dev0+unknown"
 
+    def test_unpacked_sdist(self, tmp_path, monkeypatch):
+        """Test that an unpacked sdist reads the version from its PKG-INFO."""
+        import version
+
+        (tmp_path / "PKG-INFO").write_text("Metadata-Version: 2.1\nVersion: 1.2.3\n")
+        monkeypatch.setattr(version, "__file__", str(tmp_path / "version.py"))
+        assert get_version() == "1.2.3"
+
 
 class TestIsReleaseVersion:
     """Test the is_release_version function."""
@@ -116,3 +127,29 @@ class TestIsReleaseVersion:
         """Test with an unknown version."""
         mock_get_version.return_value = "0.0.0.dev0+unknown"
         assert is_release_version() is False
+
+
+class TestPackageImport:
+    """Test what importing the plugin costs."""
+
+    def test_import_is_lightweight(self):
+        """Test that importing the plugin runs no git and loads no converter."""
+        code = (
+            "import subprocess, sys\n"
+            "def fail(*args, **kwargs):\n"
+            "    raise AssertionError('subprocess started')\n"
+            "subprocess.run = subprocess.Popen = fail\n"
+            "path = list(sys.path)\n"
+            "import mkdocs_text_export_plugin.plugin\n"
+            "import mkdocs_text_export_plugin.renderer\n"
+            "assert sys.path == path\n"
+            "assert 'html22text' not in sys.modules\n"
+            "assert 'bs4' not in sys.modules\n"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True)
+
+    def test_package_version(self):
+        """Test that the package exposes a version string."""
+        import mkdocs_text_export_plugin
+
+        assert isinstance(mkdocs_text_export_plugin.__version__, str)
@@ -0,0 +1,76 @@
+import time
+
+import pytest
+
+from mkdocs_text_export_plugin.backends import Backend
+from mkdocs_text_export_plugin.renderer import Renderer
+from mkdocs_text_export_plugin.watchdog import PageTimeout, strip_tags, time_limit
+
+
+class SlowBackend(Backend):
+    name = "slow"
+
+    def convert(self, content: str, base_url: str = "") -> str:
+        if "slow" in content:
+            time.sleep(5)
+        return "converted\n"
+
+
+def test_time_limit():
+    """Test that the block is interrupted once the limit has passed."""
+    start = time.monotonic()
+    with pytest.raises(PageTimeout):
+        with time_limit(0.1):
+            time.sleep(5)
+    assert time.monotonic() - start < 2
+
+    with time_limit(0):
+        time.sleep(0.01)
+
+
+def test_time_limit_cannot_be_swallowed():
+    """Test that a block that catches the timeout still times out."""
+    with pytest.raises(PageTimeout):
+        with time_limit(0.1):
+            try:
+                time.sleep(5)
+            except Exception:
+                pass
+
+    with pytest.raises(PageTimeout):
+        with time_limit(0.1):
+            try:
+                time.sleep(5)
+            except BaseException:
+                pass
+
+
+def test_strip_tags():
+    """Test the fallback extractor."""
+    html = (
+        "<html><head><title>T</title><style>p {}</style></head><body>"
+        "<h1>Title</h1><!-- note --><p>Fish &amp; <b>chips</b></p>"
+        "<script>alert(1)</script><ul><li>One</li><li>Two</li></ul></body></html>"
+    )
+    assert strip_tags(html) == "Title\nFish & chips\nOne\nTwo\n"
+
+
+@pytest.mark.parametrize("on_timeout", ["fallback", "skip"])
+def test_renderer_timeout(tmp_path, on_timeout):
+    """Test that slow pages fall back to tag stripping or raise."""
+    renderer = Renderer(
+        theme="mkdocs",
+        backend=f"{__name__}:SlowBackend",
+        timeout=0.1,
+        on_timeout=on_timeout,
+        cache_dir=str(tmp_path / "cache"),
+    )
+    assert renderer.render_doc("<p>fast</p>") == "converted\n"
+    if on_timeout == "fallback":
+        assert renderer.render_doc("<p>slow page</p>") == "slow page\n"
+        assert renderer.fallbacks == 1
+        # The fallback is not cached
+        assert renderer.cache.misses == 2
+    else:
+        with pytest.raises(PageTimeout):
+            renderer.render_doc("<p>slow page</p>")
@@ -0,0 +1,45 @@
+import os
+
+from mkdocs_text_export_plugin.writer import FileWriter, write_atomic
+
+
+def test_write_atomic_skips_identical_content(tmp_path):
+    """Test that identical bytes are not written again."""
+    filename = str(tmp_path / "index.txt")
+    assert write_atomic(filename, b"Hello") is True
+    os.utime(filename, (1000, 1000))
+    assert write_atomic(filename, b"Hello") is False
+    assert os.stat(filename).st_mtime == 1000
+    assert write_atomic(filename, b"Hello!") is True
+    assert (tmp_path / "index.txt").read_bytes() == b"Hello!"
+
+
+def test_write_atomic_leaves_no_temporary_files(tmp_path):
+    """Test that the temporary file is renamed into place."""
+    write_atomic(str(tmp_path / "index.txt"), b"Hello")
+    assert os.listdir(tmp_path) == ["index.txt"]
+
+
+def test_file_writer_flush(tmp_path):
+    """Test that queued writes are on disk after flush."""
+    written = []
+    writer = FileWriter(lambda *args: written.append(args))
+    for i in range(10):
+        writer.write(str(tmp_path / f"{i}.txt"), str(i).encode())
+    assert writer.flush() == []
+    assert sorted(os.listdir(tmp_path)) == sorted(f"{i}.txt" for i in range(10))
+    assert len(written) == 10
+    assert all(changed for _, _, changed in written)
+    writer.close()
+
+
+def test_file_writer_reports_errors(tmp_path):
+    """Test that failed writes are returned by flush."""
+    writer = FileWriter()
+    writer.write(str(tmp_path / "missing" / "index.txt"), b"x")
+    errors = writer.flush()
+    assert [filename for filename, _ in errors] == [
+        str(tmp_path / "missing" / "index.txt")
+    ]
+    assert writer.flush() == []
+    writer.close()
@@ -12,9 +12,19 @@ def get_version():
     """
     Get version from git tags, falling back to a default if not available.
 
+    In an unpacked sdist, the version is read from its PKG-INFO instead.
+
     Returns:
         str: Version string in semver format (e.g., "1.2.3" or "1.2.3-dev.4+abc123")
     """
+    # An unpacked sdist is not a git checkout, but its PKG-INFO records the
+    # version computed when the sdist was built
+    pkg_info = Path(__file__).parent / "PKG-INFO"
+    if pkg_info.exists() and not (Path(__file__).parent / ".git").exists():
+        for line in pkg_info.read_text(encoding="utf-8").splitlines():
+            if line.startswith("Version:"):
+                return line.split(":", 1)[1].strip()
+
     try:
         # Get the current git describe output
         result = subprocess.run(